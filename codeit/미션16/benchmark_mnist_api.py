@@ -0,0 +1,101 @@
+"""
+🏁 MNIST 추론 API 처리량 벤치마크
+
+📌 실행 방법:
+# 1) 서버 없이 마이크로 배치 로직만 측정
+python codeit/미션16/benchmark_mnist_api.py --mode inprocess --concurrency 64 --digits-per-request 1
+
+# 2) 실행 중인 서버에 HTTP 로 측정 (먼저 uvicorn 으로 mnist_api 실행)
+python codeit/미션16/benchmark_mnist_api.py --mode http --url http://localhost:8016 --concurrency 32 --digits-per-request 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def random_digits(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(count, 28, 28), dtype=np.uint8)
+
+
+def report(total_digits, latencies, elapsed):
+    latencies = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"✅ {total_digits}개 / {elapsed:.2f}s → {total_digits / elapsed:,.0f} digits/s")
+    print(f"   요청 지연 p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms")
+
+
+def bench_http(args):
+    import requests
+
+    payload = random_digits(args.digits_per_request).tobytes()
+    headers = {"Content-Type": "application/octet-stream"}
+    session = requests.Session()
+
+    def _one(_):
+        start = time.perf_counter()
+        res = session.post(f"{args.url}/predict", data=payload, headers=headers, timeout=30)
+        res.raise_for_status()
+        return time.perf_counter() - start
+
+    # 워밍업
+    for _ in range(5):
+        _one(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(_one, range(args.requests)))
+    report(args.requests * args.digits_per_request, latencies, time.perf_counter() - start)
+
+
+async def bench_inprocess(args):
+    from mnist_api import MODEL_NAME, MicroBatcher, ModelStore, INTRA_OP_THREADS
+
+    session = ModelStore().create_session(MODEL_NAME, intra_op_threads=INTRA_OP_THREADS)
+    batcher = MicroBatcher(session)
+    batcher.start()
+    digits = random_digits(args.digits_per_request).astype(np.float32) / 255.0
+
+    await batcher.submit(digits)  # 워밍업
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def _one():
+        async with semaphore:
+            t0 = time.perf_counter()
+            await batcher.submit(digits)
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(args.requests)])
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+
+    report(args.requests * args.digits_per_request, latencies, elapsed)
+    print(f"   배치 {batcher.batches}회 (평균 {batcher.digits / max(batcher.batches, 1):.1f}개/배치)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MNIST 추론 API 처리량 벤치마크")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", default="http://localhost:8016")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--digits-per-request", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mode == "http":
+        bench_http(args)
+    else:
+        asyncio.run(bench_inprocess(args))
+
+
+if __name__ == "__main__":
+    main()
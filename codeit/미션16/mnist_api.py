@@ -0,0 +1,202 @@
+"""
+🎯 미션16 MNIST 서버 추론 API (마이크로 배치)
+1. Lifespan 에서 mnist_cnn.onnx 를 1회만 로드 (로컬 모델 저장소 사용)
+2. 동시에 들어온 요청을 max_wait 동안 모아 한 번에 추론 (마이크로 배치)
+3. 입력: PNG 이미지 / raw uint8 (N x 28 x 28) / NPY 배열 - 한 장 또는 여러 장
+
+📌 실행 방법:
+uvicorn mnist_api:app --app-dir codeit/미션16 --port 8016
+
+📌 요청 예시:
+curl -X POST localhost:8016/predict -H "Content-Type: image/png" --data-binary @codeit/미션16/onnx/image1.png
+curl -X POST localhost:8016/predict -H "Content-Type: application/octet-stream" --data-binary @digits.u8
+curl -X POST localhost:8016/predict -H "Content-Type: application/x-npy" --data-binary @digits.npy
+"""
+import asyncio
+import io
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from mnist_onnx import normalize, softmax
+from onnx_model_store import ModelStore
+
+MODEL_NAME = "mnist_cnn"
+DIGIT_SIZE = 28
+MAX_BATCH = int(os.getenv("MNIST_MAX_BATCH", 512))
+MAX_WAIT_MS = float(os.getenv("MNIST_MAX_WAIT_MS", 5))
+INTRA_OP_THREADS = int(os.getenv("MNIST_INTRA_OP_THREADS", os.cpu_count() or 1))
+
+
+class MicroBatcher:
+    """동시에 들어온 요청을 모아 하나의 배치로 추론하고, 결과를 요청별로 나눠 돌려줍니다."""
+
+    def __init__(self, session, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.session = session
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.input_name = session.get_inputs()[0].name
+        self.output_names = [session.get_outputs()[0].name]
+        # 배치 차원이 1 로 고정된 모델이면 한 장씩 돌림
+        batch_dim = session.get_inputs()[0].shape[0]
+        self.dynamic_batch = not isinstance(batch_dim, int) or batch_dim != 1
+
+        self.queue = asyncio.Queue()
+        self.task = None
+        self.batches = 0
+        self.digits = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def submit(self, digits):
+        """digits: (N, 28, 28) float32 → (N, 10) 확률"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((digits, future))
+        return await future
+
+    def _infer(self, batch):
+        # 0~1 입력을 학습 때와 같은 값으로 정규화 (mnist_onnx.normalize)
+        batch = normalize(batch[:, None, :, :])
+        if self.dynamic_batch:
+            logits = self.session.run(self.output_names, {self.input_name: batch})[0]
+        else:
+            logits = np.concatenate([
+                self.session.run(self.output_names, {self.input_name: batch[i:i + 1]})[0]
+                for i in range(len(batch))
+            ])
+        return softmax(logits)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            count = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+
+            # max_wait 동안 또는 max_batch 가 찰 때까지 요청을 더 모음
+            while count < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                count += len(item[0])
+
+            batch = np.concatenate([digits for digits, _ in items])
+            try:
+                # onnxruntime 은 GIL 을 풀고 돌기 때문에 스레드로 넘겨 이벤트 루프를 막지 않음
+                probs = await loop.run_in_executor(None, self._infer, batch)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.digits += len(batch)
+            offset = 0
+            for digits, future in items:
+                if not future.done():
+                    future.set_result(probs[offset:offset + len(digits)])
+                offset += len(digits)
+
+
+def decode_digits(content_type, body):
+    """요청 본문을 (N, 28, 28) float32 (0~1) 배열로 변환합니다."""
+    if not body:
+        raise ValueError("요청 본문이 비어 있습니다.")
+
+    if content_type.startswith("image/"):
+        image = Image.open(io.BytesIO(body)).convert("L")
+        if image.size != (DIGIT_SIZE, DIGIT_SIZE):
+            image = image.resize((DIGIT_SIZE, DIGIT_SIZE))
+        array = np.asarray(image)[None]
+    elif content_type in ("application/x-npy", "application/npy"):
+        array = np.load(io.BytesIO(body), allow_pickle=False)
+        if array.ndim == 2:
+            array = array[None]
+    elif content_type == "application/octet-stream":
+        if len(body) % (DIGIT_SIZE * DIGIT_SIZE):
+            raise ValueError(f"raw 입력 길이는 {DIGIT_SIZE * DIGIT_SIZE} 바이트의 배수여야 합니다.")
+        array = np.frombuffer(body, dtype=np.uint8).reshape(-1, DIGIT_SIZE, DIGIT_SIZE)
+    else:
+        raise ValueError(f"지원하지 않는 Content-Type 입니다: {content_type}")
+
+    if array.ndim != 3 or array.shape[1:] != (DIGIT_SIZE, DIGIT_SIZE):
+        raise ValueError(f"입력 형태는 (N, {DIGIT_SIZE}, {DIGIT_SIZE}) 이어야 합니다: {array.shape}")
+    if array.shape[0] == 0:
+        raise ValueError("숫자 이미지가 없습니다. (N 은 1 이상이어야 합니다)")
+    if np.issubdtype(array.dtype, np.integer):
+        # 정수 입력(uint8 / int64 등 NPY)은 0~255 픽셀 값으로 보고 0~1 로 변환
+        if array.min() < 0 or array.max() > 255:
+            raise ValueError("정수 입력은 0~255 범위의 픽셀 값이어야 합니다.")
+        return array.astype(np.float32) / 255.0
+    return array.astype(np.float32)
+
+
+# ===============================
+# 전역 저장소 + Lifespan
+# ===============================
+ml_models = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("====== 모델로딩중...")
+    session = ModelStore().create_session(MODEL_NAME, intra_op_threads=INTRA_OP_THREADS)
+    batcher = MicroBatcher(session)
+    batcher.start()
+    ml_models["batcher"] = batcher
+    print("✅ 모델 로딩 완료")
+
+    yield
+
+    print("🧹 모델 메모리 정리")
+    await batcher.stop()
+    ml_models.clear()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/")
+def read_root():
+    batcher = ml_models.get("batcher")
+    return {
+        "status": "ok",
+        "model": MODEL_NAME,
+        "batches": batcher.batches if batcher else 0,
+        "digits": batcher.digits if batcher else 0,
+    }
+
+
+@app.post("/predict")
+async def predict(request: Request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    body = await request.body()
+    try:
+        digits = decode_digits(content_type, body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=400, detail="입력을 해석할 수 없습니다.")
+
+    probs = await ml_models["batcher"].submit(digits)
+    return {
+        "predictions": probs.argmax(axis=1).tolist(),
+        "probabilities": probs.round(6).tolist(),
+    }
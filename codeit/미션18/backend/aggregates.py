@@ -0,0 +1,133 @@
+"""
+📊 Movie 리뷰 집계 컬럼(review_count / rating_sum / rating_avg) 관리
+
+- ensure_columns: 예전 movies.db 에 집계 컬럼이 없으면 추가하고 리뷰 테이블에서 채움
+- backfill: reviews 테이블 기준으로 집계값을 다시 계산 (movie_ids 를 주면 해당 영화만)
+- find_inconsistent: 저장된 집계값과 실제 리뷰 집계가 다른 영화 목록
+
+📌 실행 방법 (backend 폴더에서):
+python aggregates.py check     # 불일치 영화 출력 (있으면 exit 1)
+python aggregates.py repair    # 불일치 영화만 다시 계산
+python aggregates.py backfill  # 전체 다시 계산
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import case, func, inspect, select, text
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import database, models
+
+AGGREGATE_COLUMNS = {
+    "review_count": "INTEGER NOT NULL DEFAULT 0",
+    "rating_sum": "FLOAT NOT NULL DEFAULT 0",
+    "rating_avg": "FLOAT NOT NULL DEFAULT 0",
+}
+# 부동소수 합계 비교 허용 오차
+RATING_TOLERANCE = 1e-6
+
+
+def _actual_aggregates():
+    """reviews 테이블 기준 영화별 (리뷰 수, 점수 합) 서브쿼리"""
+    return (
+        select(
+            models.Review.movie_id.label("movie_id"),
+            func.count(models.Review.id).label("review_count"),
+            func.coalesce(func.sum(models.Review.rating), 0.0).label("rating_sum"),
+        )
+        .group_by(models.Review.movie_id)
+        .subquery()
+    )
+
+
+def average_expression():
+    return case((models.Movie.review_count > 0, models.Movie.rating_sum / models.Movie.review_count), else_=0.0)
+
+
+def ensure_columns(engine):
+    """집계 컬럼이 없으면 추가합니다. 반환값: 새로 추가한 컬럼 이름 목록"""
+    existing = {column["name"] for column in inspect(engine).get_columns(models.Movie.__tablename__)}
+    added = [name for name in AGGREGATE_COLUMNS if name not in existing]
+    if added:
+        with engine.begin() as conn:
+            for name in added:
+                conn.execute(text(f"ALTER TABLE movies ADD COLUMN {name} {AGGREGATE_COLUMNS[name]}"))
+    return added
+
+
+def backfill(db: Session, movie_ids=None):
+    """reviews 테이블로 집계값을 다시 계산합니다. 반환값: 갱신한 영화 수"""
+    count_sq = (
+        select(func.count(models.Review.id))
+        .where(models.Review.movie_id == models.Movie.id)
+        .scalar_subquery()
+    )
+    sum_sq = (
+        select(func.coalesce(func.sum(models.Review.rating), 0.0))
+        .where(models.Review.movie_id == models.Movie.id)
+        .scalar_subquery()
+    )
+    query = db.query(models.Movie)
+    if movie_ids is not None:
+        query = query.filter(models.Movie.id.in_(movie_ids))
+    updated = query.update(
+        {models.Movie.review_count: count_sq, models.Movie.rating_sum: sum_sq},
+        synchronize_session=False,
+    )
+    # 평균은 방금 갱신한 합/개수로 다시 계산
+    query.update({models.Movie.rating_avg: average_expression()}, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def find_inconsistent(db: Session):
+    """[(movie_id, 저장된 리뷰 수, 실제 리뷰 수, 저장된 점수 합, 실제 점수 합)] 목록"""
+    actual = _actual_aggregates()
+    actual_count = func.coalesce(actual.c.review_count, 0)
+    actual_sum = func.coalesce(actual.c.rating_sum, 0.0)
+    rows = (
+        db.query(models.Movie.id, models.Movie.review_count, actual_count,
+                 models.Movie.rating_sum, actual_sum)
+        .outerjoin(actual, actual.c.movie_id == models.Movie.id)
+        .filter(
+            (models.Movie.review_count != actual_count)
+            | (func.abs(models.Movie.rating_sum - actual_sum) > RATING_TOLERANCE)
+            | (func.abs(models.Movie.rating_avg - average_expression()) > RATING_TOLERANCE)
+        )
+        .all()
+    )
+    return [tuple(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영화 리뷰 집계 컬럼 점검/복구")
+    parser.add_argument("command", choices=["check", "repair", "backfill"])
+    args = parser.parse_args()
+
+    import migrations
+    migrations.upgrade(database.engine)
+
+    db = database.SessionLocal()
+    try:
+        if args.command == "backfill":
+            print(f"✅ {backfill(db)}개 영화 집계값 재계산 완료")
+            return
+
+        broken = find_inconsistent(db)
+        for movie_id, count, real_count, rating_sum, real_sum in broken:
+            print(f"❌ 영화 {movie_id}: 리뷰 수 {count} ≠ {real_count}, 점수 합 {rating_sum} ≠ {real_sum}")
+        if not broken:
+            print("✅ 집계값이 모두 일치합니다.")
+        elif args.command == "repair":
+            print(f"🔧 {backfill(db, [row[0] for row in broken])}개 영화 복구 완료")
+        else:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
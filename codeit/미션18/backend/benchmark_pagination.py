@@ -0,0 +1,112 @@
+"""
+🏁 목록 페이지네이션 벤치마크: offset/limit vs 키셋(커서)
+
+임시 DB 에 합성 영화 N 편(기본 300,000편)을 만들고 정렬별로
+1페이지와 --deep-page 페이지(기본 10,000페이지)를 가져오는 시간을 비교합니다.
+offset 은 앞 페이지 행을 모두 건너뛰어야 해서 깊은 페이지일수록 느려지고,
+커서는 인덱스에서 마지막 위치부터 읽으므로 페이지 번호와 상관없이 거의 일정합니다.
+
+📌 실행 방법 (backend 폴더에서):
+python benchmark_pagination.py --movies 300000 --deep-page 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import crud, database, migrations, models, pagination
+
+
+def seed(engine, count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        reviews = rng.randint(0, 20)
+        rating_sum = sum(rng.uniform(0, 10) for _ in range(reviews))
+        year = rng.randint(1960, 2025)
+        rows.append({
+            "title": f"영화 {rng.randrange(count):07d}",
+            "director": "감독",
+            "genre": "드라마",
+            "release_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "release_year": year,
+            "review_count": reviews,
+            "rating_sum": rating_sum,
+            "rating_avg": rating_sum / reviews if reviews else 0.0,
+        })
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO movies (title, director, genre, poster_url, release_date, release_year, "
+                 "review_count, rating_sum, rating_avg) VALUES (:title, :director, :genre, '', :release_date, "
+                 ":release_year, :review_count, :rating_sum, :rating_avg)"),
+            rows,
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def offset_page(db, sort, page, limit):
+    key, descending, _ = crud.MOVIE_SORTS[sort]
+    order = (key.desc(), models.Movie.id.desc()) if descending else (key.asc(), models.Movie.id.asc())
+    return db.query(models.Movie).order_by(*order).offset((page - 1) * limit).limit(limit).all()
+
+
+def cursor_for_page(db, sort, page, limit):
+    """page 번째 페이지를 가져올 커서 (앞 페이지 마지막 행으로 만듦, 측정 대상 아님)"""
+    if page == 1:
+        return None
+    key, descending, value_of = crud.MOVIE_SORTS[sort]
+    last = offset_page(db, sort, page - 1, limit)[-1]
+    return pagination.encode_cursor(f"{sort}:{'desc' if descending else 'asc'}", value_of(last), last.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="목록 페이지네이션 벤치마크 (offset vs cursor)")
+    parser.add_argument("--movies", type=int, default=300_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.deep_page * args.limit > args.movies:
+        parser.error("--movies 가 --deep-page x --limit 보다 커야 합니다.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.apply_sqlite_pragmas(create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+        migrations.upgrade(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        start = time.perf_counter()
+        seed(engine, args.movies)
+        print(f"📦 합성 영화 {args.movies:,}편 생성: {time.perf_counter() - start:.1f}s\n")
+
+        db = SessionLocal()
+        print(f"{'정렬':<14}{'페이지':>8}{'offset(ms)':>12}{'cursor(ms)':>12}")
+        for sort in crud.MOVIE_SORTS:
+            for page in (1, args.deep_page):
+                cursor = cursor_for_page(db, sort, page, args.limit)
+                offset_ms = timed(lambda: offset_page(db, sort, page, args.limit), args.repeat)
+                cursor_ms = timed(lambda: crud.get_movies(db, cursor=cursor, limit=args.limit, sort=sort), args.repeat)
+                print(f"{sort:<14}{page:>8,}{offset_ms:>12.2f}{cursor_ms:>12.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+🏁 영화 검색 벤치마크: ilike '%x%' 전체 스캔 vs FTS5 trigram 색인
+
+임시 DB 에 합성 영화 N 편(기본 100,000편)을 만들고, 같은 검색어로
+1) 기존 방식 title/director ilike 필터
+2) crud.movies_query (FTS 색인) / search.search_movies (bm25 순)
+의 조회 시간을 비교합니다.
+
+📌 실행 방법 (backend 폴더에서):
+python benchmark_search.py --movies 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import crud, database, migrations, models, search
+
+WORDS = ["사랑", "전쟁", "기억", "바다", "도시", "마법사", "비밀", "여름", "괴물", "왕국",
+         "우주", "형사", "소년", "그림자", "시간", "해리", "포터", "다크", "나이트", "인셉션"]
+NAMES = ["크리스토퍼 놀란", "봉준호", "박찬욱", "제임스 카메론", "크리스 콜럼버스", "스티븐 스필버그",
+         "류승완", "나홍진", "드니 빌뇌브", "쿠엔틴 타란티노"]
+GENRES = ["드라마", "범죄", "SF", "액션", "로맨스", "판타지", "스릴러", "코미디", "애니메이션"]
+QUERIES = [("title", "마법사"), ("title", "해리 포터"), ("title", "그림자왕국"), ("director", "크리스토퍼"),
+           ("director", "봉준호")]
+
+
+def seed(engine, count, seed=0):
+    rng = random.Random(seed)
+    rows = [
+        {
+            "title": " ".join(rng.sample(WORDS, rng.randint(1, 3))) + f" {i}",
+            "director": rng.choice(NAMES),
+            "genre": ", ".join(rng.sample(GENRES, rng.randint(1, 2))),
+            "poster_url": "",
+            "release_date": f"{rng.randint(1960, 2025)}-01-01",
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO movies (title, director, genre, poster_url, release_date, release_year) "
+                 "VALUES (:title, :director, :genre, :poster_url, :release_date, "
+                 "CAST(substr(:release_date, 1, 4) AS INTEGER))"),
+            rows,
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영화 검색 벤치마크 (ilike vs FTS5)")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.apply_sqlite_pragmas(create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+        migrations.upgrade(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        start = time.perf_counter()
+        seed(engine, args.movies)
+        db = SessionLocal()
+        search.rebuild(db)
+        print(f"📦 합성 영화 {args.movies:,}편 + 색인 생성: {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'필터':<10}{'검색어':<12}{'ilike(ms)':>10}{'FTS(ms)':>10}{'bm25(ms)':>10}{'건수(ilike/FTS)':>18}")
+        for field, term in QUERIES:
+            column = getattr(models.Movie, field)
+            ilike_ms, ilike_rows = timed(
+                lambda: db.query(models.Movie).filter(column.ilike(f"%{term}%")).limit(args.limit).all(), args.repeat)
+            fts_ms, fts_rows = timed(
+                lambda: crud.movies_query(db, **{field: term}).limit(args.limit).all(), args.repeat)
+            rank_ms, _ = timed(lambda: search.search_movies(db, term, limit=args.limit), args.repeat)
+            # 전체 매칭 건수 (LIMIT 없이) - 띄어쓰기 차이로 ilike 가 놓치는 결과 확인용
+            ilike_total = db.query(models.Movie).filter(column.ilike(f"%{term}%")).count()
+            fts_total = crud.movies_query(db, **{field: term}).count()
+            print(f"{field:<10}{term:<12}{ilike_ms:>10.2f}{fts_ms:>10.2f}{rank_ms:>10.2f}"
+                  f"{f'{ilike_total}/{fts_total}':>18}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+🔎 SQL 점검 스크립트
+
+임시 SQLite DB 에 영화/리뷰를 넣고
+1. 각 API 가 응답을 만들 때(스키마 직렬화 포함) 실행되는 SQL 문 개수가 영화 수와 상관없이 고정인지 (N+1 방지)
+2. crud.get_movies 의 모든 필터 조합, 정렬별 커서 페이지, 리뷰 조회가 EXPLAIN QUERY PLAN 에서
+   movies / reviews 를 전체 스캔(SCAN)하지 않고 인덱스로 찾는지 (SEARCH)
+확인합니다. 플랜은 영화가 적으면 전체 스캔이 더 싸다고 판단하므로 PLAN_MOVIES 개를 더 넣고 ANALYZE 한 뒤 확인합니다.
+
+📌 실행 방법 (backend 폴더에서):
+python check_queries.py
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import models, schemas, crud, aggregates, database, genres, migrations, search
+
+MOVIES = 50
+REVIEWS_PER_MOVIE = 5
+# 쿼리 플랜 확인용 카탈로그 크기 (실제 서비스 규모에 가까워야 플래너가 같은 플랜을 고름)
+PLAN_MOVIES = 5000
+PLAN_GENRES = ["드라마", "범죄", "SF", "액션", "코미디", "스릴러", "로맨스", "애니메이션", "공포", "판타지", "가족", "전쟁"]
+
+
+@contextmanager
+def count_statements(engine):
+    """블록 안에서 실행된 (SQL 문, 파라미터) 를 모아서 돌려줍니다."""
+    statements = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def seed(db):
+    for i in range(MOVIES):
+        movie = models.Movie(
+            title=f"영화 {i}", director=f"감독 {i % 7}", genre="범죄, 드라마" if i % 2 else "SF",
+            poster_url="", release_date=f"{1990 + i % 30}-01-01",
+        )
+        movie.reviews = [
+            models.Review(author="익명", content="좋아요", rating=float(j * 2), sentiment="긍정",
+                          created_at="2025-01-01 00:00:00")
+            for j in range(REVIEWS_PER_MOVIE)
+        ]
+        db.add(movie)
+    db.commit()
+    # relationship 으로 직접 넣은 리뷰/장르는 crud 를 거치지 않으므로 집계 컬럼과 장르 연결을 다시 계산
+    aggregates.backfill(db)
+    genres.backfill(db)
+
+
+def seed_catalog(db, movies=PLAN_MOVIES):
+    """플랜 확인용으로 장르/감독/개봉년도가 골고루 섞인 영화와 리뷰를 한 번에 넣고 집계/색인을 다시 만듭니다."""
+    rng = random.Random(0)
+    start = db.execute(text("SELECT coalesce(max(id), 0) FROM movies")).scalar() + 1
+    rows = []
+    for movie_id in range(start, start + movies):
+        year = rng.randint(1950, 2024)
+        rows.append({
+            "id": movie_id, "title": f"카탈로그 영화 {movie_id}",
+            "director": f"카탈로그 감독 {rng.randrange(movies // 10)}",
+            "genre": ", ".join(rng.sample(PLAN_GENRES, rng.randint(1, 3))), "poster_url": "",
+            "release_date": f"{year}-{rng.randint(1, 12):02d}-01", "release_year": year,
+        })
+    db.execute(text(
+        "INSERT INTO movies (id, title, director, genre, poster_url, release_date, release_year) "
+        "VALUES (:id, :title, :director, :genre, :poster_url, :release_date, :release_year)"
+    ), rows)
+    db.execute(text(
+        "INSERT INTO reviews (movie_id, author, content, rating, sentiment, created_at) "
+        "VALUES (:movie_id, '익명', '좋아요', :rating, '긍정', '2025-01-01 00:00:00')"
+    ), [{"movie_id": row["id"], "rating": float(rng.randint(0, 10))}
+        for row in rows for _ in range(rng.randint(0, REVIEWS_PER_MOVIE * 2))])
+    db.commit()
+    aggregates.backfill(db)
+    genres.backfill(db)
+    search.rebuild(db)
+
+
+def check(name, engine, SessionLocal, fn, expected):
+    # 요청마다 새 세션을 쓰는 get_db 와 같은 조건으로 측정
+    db = SessionLocal()
+    try:
+        with count_statements(engine) as statements:
+            fn(db)
+    finally:
+        db.close()
+    ok = len(statements) == expected
+    print(f"{'✅' if ok else '❌'} {name}: SQL {len(statements)}회 (기대값 {expected}회)")
+    if not ok:
+        for statement, _ in statements:
+            print("   ", " ".join(statement.split())[:120])
+    return ok
+
+
+# get_movies 필터별 예시 값
+FILTERS = {"title": "해리포터", "genre": "드라마", "director": "크리스토퍼", "year": "1995"}
+# 필터별로 movies 를 찾는 방법 (플래너가 그중 하나로 movies 를 좁히면 됨)
+# 제목/감독/장르는 서브쿼리가 만든 id 목록으로 기본 키를 찾고, 연도는 release_year 인덱스로 찾음
+FILTER_ACCESS = {
+    "title": "SEARCH movies USING INTEGER PRIMARY KEY",
+    "genre": "SEARCH movies USING INTEGER PRIMARY KEY",
+    "director": "SEARCH movies USING INTEGER PRIMARY KEY",
+    "year": "SEARCH movies USING INDEX ix_movies_release_year",
+}
+# id 목록을 만드는 서브쿼리가 타야 하는 인덱스 (필터마다 모두 필요)
+FILTER_INDEXES = {
+    "title": "movies_fts VIRTUAL TABLE INDEX",
+    "genre": "INDEX ix_movie_genres_genre_id",
+    "director": "movies_fts VIRTUAL TABLE INDEX",
+}
+# 정렬별로 커서 위치부터 범위 탐색해야 하는 인덱스 (id 는 테이블 자체가 id 순)
+SORT_INDEXES = {
+    "id": "SEARCH movies USING INTEGER PRIMARY KEY",
+    "rating": "SEARCH movies USING INDEX ix_movies_rating_avg",
+    "release_date": "SEARCH movies USING INDEX ix_movies_release_sort",
+    "title": "SEARCH movies USING INDEX ix_movies_title_sort",
+}
+
+
+def query_plan(engine, query):
+    """ORM 쿼리의 EXPLAIN QUERY PLAN 결과를 한 줄 문자열로"""
+    sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return " / ".join(row[-1] for row in rows)
+
+
+def full_scan(plan, table):
+    """플랜에 table 전체 스캔 단계가 있는지 (SCAN movies, SCAN movies USING ... INDEX 등, movies_fts 는 제외)"""
+    return any(step == f"SCAN {table}" or step.startswith(f"SCAN {table} ") for step in plan.split(" / "))
+
+
+def check_plan(name, engine, query, index, table):
+    plan = query_plan(engine, query)
+    ok = index in plan and not full_scan(plan, table)
+    print(f"{'✅' if ok else '❌'} {name}: {plan}")
+    return ok
+
+
+def executed_plan(engine, SessionLocal, fn):
+    """fn 이 실제로 실행한 첫 SQL 문의 EXPLAIN QUERY PLAN (crud 함수 안에서 만든 쿼리 확인용)"""
+    db = SessionLocal()
+    try:
+        with count_statements(engine) as statements:
+            fn(db)
+    finally:
+        db.close()
+    statement, parameters = statements[0]
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return " / ".join(row[-1] for row in rows)
+
+
+def check_sort_plans(engine, SessionLocal):
+    """정렬별로 두 번째 페이지(커서 사용)가 (정렬 키, id) 인덱스를 그대로 따라가는지 (정렬용 임시 B-tree 없음)"""
+    results = []
+    for sort, index in SORT_INDEXES.items():
+        for order in ("asc", "desc"):
+            db = SessionLocal()
+            try:
+                _, cursor, _ = crud.get_movies(db, limit=5, sort=sort, order=order)
+            finally:
+                db.close()
+            plan = executed_plan(engine, SessionLocal,
+                                 lambda db: crud.get_movies(db, cursor=cursor, limit=5, sort=sort, order=order))
+            ok = index in plan and not full_scan(plan, "movies") and "TEMP B-TREE" not in plan
+            print(f"{'✅' if ok else '❌'} get_movies(sort={sort}, order={order}, cursor): {plan}")
+            results.append(ok)
+
+    db = SessionLocal()
+    try:
+        _, cursor, _ = crud.get_reviews_page(db, 1, limit=2)
+    finally:
+        db.close()
+    plan = executed_plan(engine, SessionLocal, lambda db: crud.get_reviews_page(db, 1, cursor=cursor, limit=2))
+    ok = "ix_reviews_movie_id" in plan and not full_scan(plan, "reviews") and "TEMP B-TREE" not in plan
+    print(f"{'✅' if ok else '❌'} get_reviews_page(cursor): {plan}")
+    results.append(ok)
+    return results
+
+
+def check_plans(engine, SessionLocal):
+    db = SessionLocal()
+    results = []
+    try:
+        for size in range(len(FILTERS) + 1):
+            for names in itertools.combinations(FILTERS, size):
+                filters = {name: FILTERS[name] for name in names}
+                query = crud.movies_query(db, **filters)
+                label = f"get_movies({', '.join(names) or '필터 없음'})"
+                if names:
+                    # movies 는 필터 하나로 좁혀서 찾고 (나머지 조건은 그 결과에 적용), 전체 스캔은 없어야 함
+                    plan = query_plan(engine, query)
+                    ok = (
+                        not full_scan(plan, "movies")
+                        and any(FILTER_ACCESS[name] in plan for name in names)
+                        and all(FILTER_INDEXES[name] in plan for name in names if name in FILTER_INDEXES)
+                    )
+                    print(f"{'✅' if ok else '❌'} {label}: {plan}")
+                    results.append(ok)
+                else:
+                    # 필터가 없으면 인덱스로 좁힐 조건이 없음 (LIMIT 까지만 읽는 스캔)
+                    print(f"➖ {label}: {query_plan(engine, query)}")
+
+        results.append(check_plan(
+            "get_reviews(movie_id)", engine,
+            db.query(models.Review).filter(models.Review.movie_id == 1), "INDEX ix_reviews_movie_id", "reviews",
+        ))
+        results.append(check_plan(
+            "selectinload(Movie.reviews)", engine,
+            db.query(models.Review).filter(models.Review.movie_id.in_([1, 2, 3])), "INDEX ix_reviews_movie_id", "reviews",
+        ))
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.apply_sqlite_pragmas(create_engine(f"sqlite:///{os.path.join(tmp, 'check.db')}"))
+        migrations.upgrade(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = SessionLocal()
+        seed(db)
+        db.close()
+
+        results = [
+            check("GET /movies", engine, SessionLocal,
+                  lambda db: [schemas.MovieListItem.model_validate(m) for m in crud.get_movies(db, limit=MOVIES)[0]], 1),
+            check("GET /movies (필터)", engine, SessionLocal,
+                  lambda db: [schemas.MovieListItem.model_validate(m)
+                              for m in crud.get_movies(db, title="영화", genre="드라마", director="감독", year="199")[0]], 1),
+            check("GET /movies_all", engine, SessionLocal,
+                  lambda db: [schemas.MovieListItem.model_validate(m) for m in crud.get_movies_all(db)], 1),
+            check("GET /movies/{id}", engine, SessionLocal,
+                  lambda db: schemas.Movie.model_validate(crud.get_movie(db, 1)), 2),
+            check("GET /movies/{id}/reviews", engine, SessionLocal,
+                  lambda db: [schemas.Review.model_validate(r) for r in crud.get_reviews_page(db, 1)[0]], 1),
+            # 장르별 / 연도별 / 전체 영화 수 (캐시가 비었을 때)
+            check("GET /facets", engine, SessionLocal,
+                  lambda db: schemas.Facets.model_validate(genres.compute_facets(db)), 3),
+        ]
+        db = SessionLocal()
+        seed_catalog(db)
+        db.close()
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        results += check_plans(engine, SessionLocal)
+        results += check_sort_plans(engine, SessionLocal)
+        engine.dispose()
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
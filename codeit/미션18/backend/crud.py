@@ -1,59 +1,101 @@
-from sqlalchemy.orm import Session
-import models, schemas
+from sqlalchemy.orm import Session, selectinload
+import models, schemas, search, genres, pagination, sentiment_worker
 
 import os
 import json
-from sentiment import analyze_sentiment
 
-from sqlalchemy import func
+from sqlalchemy import case
 
 # Movie CRUD
+# review_count / average_rating 은 Movie 컬럼(집계값)에서 바로 읽으므로 리뷰 테이블을 JOIN 하지 않음
 def get_movies_all(db: Session):
     return db.query(models.Movie).all()
-def get_movies(db: Session, skip: int = 0, limit: int = 100, 
-               title: str = None, genre: str = None, 
-               director: str = None, year: str = None):
-    # 기본 쿼리: 영화 정보와 리뷰 평균 점수를 JOIN해서 가져옴
-    # outerjoin을 써야 리뷰가 없는 영화도 나옵니다.
-    query = db.query(
-        models.Movie,
-        func.avg(models.Review.rating).label("average_rating")
-    ).outerjoin(models.Review).group_by(models.Movie.id)
+def movie_filters(title: str = None, genre: str = None,
+                  director: str = None, year: str = None):
+    """목록 필터 → WHERE 조건 목록 (crud_async 와 같이 사용)"""
+    conditions = []
 
     # SQL WHERE 필터링
-    if title:
-        query = query.filter(models.Movie.title.ilike(f"%{title.strip()}%"))
+    # 제목/감독은 FTS 색인으로 찾고, 3글자 미만이라 색인으로 못 찾으면 ilike 로 대체 (search.py)
+    title_match = search.match_expression(title, "title") if title else None
+    director_match = search.match_expression(director, "director") if director else None
+    if title_match:
+        conditions.append(models.Movie.id.in_(search.matching_ids(title_match, "title_match")))
+    elif title:
+        conditions.append(models.Movie.title.ilike(f"%{title.strip()}%"))
     if genre and genre != "전체":
-        # query = query.filter(models.Movie.genre == genre)
-        query = query.filter(models.Movie.genre.contains(genre))
-    if director:
-        query = query.filter(models.Movie.director.ilike(f"%{director.strip()}%"))
+        # query = query.filter(models.Movie.genre.contains(genre))
+        # 정규화된 장르 테이블로 정확히 일치 (movie_genres 인덱스 사용)
+        conditions.append(models.Movie.id.in_(genres.genre_filter(genre)))
+    if director_match:
+        conditions.append(models.Movie.id.in_(search.matching_ids(director_match, "director_match")))
+    elif director:
+        conditions.append(models.Movie.director.ilike(f"%{director.strip()}%"))
     if year and year != "전체":
-        query = query.filter(models.Movie.release_date.startswith(year.strip()))
+        # 4자리 연도는 인덱스가 있는 release_year 로 비교, 그 외 형식은 예전처럼 앞부분 일치
+        release_year = models.parse_year(year)
+        if release_year is not None and len(year.strip()) == 4:
+            conditions.append(models.Movie.release_year == release_year)
+        else:
+            conditions.append(models.Movie.release_date.startswith(year.strip()))
 
-    results = query.offset(skip).limit(limit).all()
-    
-    # 결과를 Pydantic 모델에 맞게 변환 (평균 점수 주입)
-    movies = []
-    for movie_obj, avg_rating in results:
-        # DB 객체에 동적으로 average_rating 속성 추가
-        movie_obj.average_rating = round(avg_rating, 1) if avg_rating else 0.0
-        movies.append(movie_obj)
-        
-    return movies
+    return conditions
+
+def movies_query(db: Session, title: str = None, genre: str = None,
+                 director: str = None, year: str = None):
+    return db.query(models.Movie).filter(*movie_filters(title=title, genre=genre, director=director, year=year))
+
+# 정렬 기준 → (정렬 키 식, 기본 내림차순 여부, 행 → 커서 값)
+# 정렬 키마다 (키, id) 인덱스가 있어서 몇 번째 페이지든 인덱스에서 커서 위치부터 limit 개만 읽음
+MOVIE_SORTS = {
+    "id": (models.Movie.id, False, lambda m: m.id),
+    "rating": (models.Movie.rating_avg, True, lambda m: m.rating_avg),
+    "release_date": (models.RELEASE_SORT_KEY, True, lambda m: m.release_date or ""),
+    "title": (models.TITLE_SORT_KEY, False, lambda m: m.title or ""),
+}
+
+def movie_sort(sort: str, order: str = None):
+    """정렬 기준 → (정렬 키 식, 내림차순 여부, 행 → 커서 값, 커서용 정렬 이름)"""
+    key, descending, value_of = MOVIE_SORTS[sort]
+    if order:
+        descending = order == "desc"
+    # 커서에 정렬 방향까지 넣어서 다른 정렬의 커서를 섞어 쓰지 않게 함
+    return key, descending, value_of, f"{sort}:{'desc' if descending else 'asc'}"
+
+def get_movies(db: Session, cursor: str = None, limit: int = 20, sort: str = "id", order: str = None,
+               title: str = None, genre: str = None, 
+               director: str = None, year: str = None):
+    """키셋 페이지네이션 목록. 반환값: (영화 목록, next_cursor, has_more)"""
+    key, descending, value_of, sort_name = movie_sort(sort, order)
+    query = movies_query(db, title=title, genre=genre, director=director, year=year)
+    return pagination.keyset_page(query, sort_name, key, models.Movie.id, descending,
+                                  cursor=cursor, limit=limit, value_of=value_of)
 
 def get_movie(db: Session, movie_id: int):
-    movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-    if movie:
-        # 상세 조회 시에도 평균 점수 계산 (SQL 1회 더 실행)
-        avg = db.query(func.avg(models.Review.rating)).filter(models.Review.movie_id == movie_id).scalar()
-        movie.average_rating = round(avg, 1) if avg else 0.0
-    return movie
+    # 상세 조회는 리뷰 목록이 필요하므로 selectinload 로 명시적으로 함께 로드 (SELECT 2번으로 고정)
+    return (
+        db.query(models.Movie)
+        .options(selectinload(models.Movie.reviews))
+        .filter(models.Movie.id == movie_id)
+        .first()
+    )
+
+def _sync_derived(db: Session, db_movies):
+    # 검색 색인 / 장르 연결을 영화 변경과 같은 트랜잭션에서 갱신 (id 가 필요하므로 flush 먼저)
+    db.flush()
+    for db_movie in db_movies:
+        search.index_movie(db, db_movie)
+        genres.sync_movie_genres(db, db_movie)
+
+def get_facets(db: Session):
+    return genres.get_facets(db)
 
 def create_movie(db: Session, movie: schemas.MovieCreate):
     db_movie = models.Movie(**movie.model_dump())
     db.add(db_movie)
+    _sync_derived(db, [db_movie])
     db.commit()
+    genres.invalidate_facets()
     db.refresh(db_movie)
     return db_movie
 
@@ -62,25 +104,45 @@ def update_movie(db: Session, movie_id: int, movie_data: schemas.MovieCreate):
     if db_movie:
         for key, value in movie_data.model_dump().items():
             setattr(db_movie, key, value)
+        _sync_derived(db, [db_movie])
         db.commit()
+        genres.invalidate_facets()
         db.refresh(db_movie)
     return db_movie
 
 def delete_movie(db: Session, movie_id: int):
     db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
     if db_movie:
+        search.remove_movie(db, movie_id)
         db.delete(db_movie)
         db.commit()
+        genres.invalidate_facets()
         return True
     return False
 
 # Review CRUD 추가
+def _adjust_aggregates(db: Session, movie_id: int, count_delta: int, rating_delta: float):
+    # UPDATE ... SET col = col + delta 로 갱신해서 동시 요청끼리 값을 덮어쓰지 않게 함
+    # (commit 은 호출한 쪽에서 리뷰 변경과 함께 → 집계값과 리뷰가 항상 같은 트랜잭션)
+    new_count = models.Movie.review_count + count_delta
+    new_sum = models.Movie.rating_sum + rating_delta
+    db.query(models.Movie).filter(models.Movie.id == movie_id).update({
+        models.Movie.review_count: new_count,
+        models.Movie.rating_sum: new_sum,
+        models.Movie.rating_avg: case((new_count > 0, new_sum / new_count), else_=0.0),
+    }, synchronize_session=False)
+
 def get_reviews(db: Session, movie_id: int):
     return db.query(models.Review).filter(models.Review.movie_id == movie_id).all()
 
+def get_reviews_page(db: Session, movie_id: int, cursor: str = None, limit: int = 20):
+    """영화 리뷰 최신순 키셋 페이지 (reviews.movie_id 인덱스). 반환값: (리뷰 목록, next_cursor, has_more)"""
+    query = db.query(models.Review).filter(models.Review.movie_id == movie_id)
+    return pagination.keyset_page(query, "reviews:desc", models.Review.id, models.Review.id, True,
+                                  cursor=cursor, limit=limit, value_of=lambda r: r.id)
+
 def create_review(db: Session, movie_id: int, review: schemas.ReviewCreate):
     from datetime import datetime
-    sentiment = analyze_sentiment(review.content)
     
     # 기본값 보장
     author = review.author if review.author else "익명"
@@ -89,18 +151,22 @@ def create_review(db: Session, movie_id: int, review: schemas.ReviewCreate):
     db_review = models.Review(
         **review.model_dump(exclude={"author", "created_at"}),
         movie_id=movie_id,
-        sentiment=sentiment,
         author=author,
         created_at=created_at
     )
+    # 감성 분석은 백그라운드 워커가 배치로 처리 (sentiment 는 분석 전까지 None)
+    sentiment_worker.mark_pending(db_review)
     db.add(db_review)
+    _adjust_aggregates(db, movie_id, 1, db_review.rating or 0.0)
     db.commit()
+    sentiment_worker.notify()
     db.refresh(db_review)
     return db_review
 
 def delete_review(db: Session, review_id: int):
     db_review = db.query(models.Review).filter(models.Review.id == review_id).first()
     if db_review:
+        _adjust_aggregates(db, db_review.movie_id, -1, -(db_review.rating or 0.0))
         db.delete(db_review)
         db.commit()
         return True
@@ -109,14 +175,20 @@ def delete_review(db: Session, review_id: int):
 def update_review(db: Session, review_id: int, review_data: schemas.ReviewCreate):
     db_review = db.query(models.Review).filter(models.Review.id == review_id).first()
     if db_review:
-        # 내용이 바뀌면 감성 분석도 다시 수행
-        if db_review.content != review_data.content:
-            db_review.sentiment = analyze_sentiment(review_data.content)
+        # 내용이 바뀌면 감성 분석도 다시 수행 (백그라운드 워커)
+        rescore = db_review.content != review_data.content
+        if rescore:
+            sentiment_worker.mark_pending(db_review)
             
+        old_rating = db_review.rating or 0.0
         for key, value in review_data.model_dump().items():
             if key != "sentiment": # sentiment는 위에서 별도로 처리함
                 setattr(db_review, key, value)
+        if (db_review.rating or 0.0) != old_rating:
+            _adjust_aggregates(db, db_review.movie_id, 0, (db_review.rating or 0.0) - old_rating)
         db.commit()
+        if rescore:
+            sentiment_worker.notify()
         db.refresh(db_review)
     return db_review
 
@@ -130,7 +202,9 @@ def init_db(db: Session):
                 models.Movie(**movie) for movie in movies_data
             ]
             db.add_all(initial_movies)
+            _sync_derived(db, initial_movies)
             db.commit()
+            genres.invalidate_facets()
         else:
             # Fallback to a small set if file doesn't exist
             fallback_movies = [
@@ -139,4 +213,6 @@ def init_db(db: Session):
                 models.Movie(title="인셉션", director="크리스토퍼 놀란", genre="SF", poster_url="https://media.themoviedb.org/t/p/w300_and_h450_face/zTgjeblxSLSvomt6F6UYtpiD4n7.jpg", release_date="2010-07-16")
             ]
             db.add_all(fallback_movies)
-            db.commit()
\ No newline at end of file
+            _sync_derived(db, fallback_movies)
+            db.commit()
+            genres.invalidate_facets()
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+⚡ 비동기 CRUD (AsyncSession + aiosqlite) - main.py 의 async 엔드포인트용
+
+crud.py 와 같은 함수 이름/반환값을 유지하고, 필터/정렬/커서 로직은 crud / pagination 을 그대로 재사용합니다.
+- 비동기 세션에서는 lazy load 가 안 되므로 응답에 필요한 관계(reviews)는 selectinload 로 미리 로드
+- 검색 색인 / 장르 연결처럼 sync Session 용으로 만든 코드는 db.run_sync(...) 로 같은 트랜잭션에서 실행
+- 감성 분석(BERT 추론 + GPT 호출)은 요청에서 기다리지 않고 백그라운드 워커가 배치로 처리 (sentiment_worker.py)
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+import models, schemas, search, genres, pagination, crud, sentiment_worker
+
+
+# Movie CRUD
+async def get_movies_all(db: AsyncSession):
+    return (await db.scalars(select(models.Movie))).all()
+
+async def get_movies(db: AsyncSession, cursor: str = None, limit: int = 20, sort: str = "id", order: str = None,
+                     title: str = None, genre: str = None,
+                     director: str = None, year: str = None):
+    """키셋 페이지네이션 목록. 반환값: (영화 목록, next_cursor, has_more)"""
+    key, descending, value_of, sort_name = crud.movie_sort(sort, order)
+    stmt = select(models.Movie).where(*crud.movie_filters(title=title, genre=genre, director=director, year=year))
+    stmt = pagination.keyset_statement(stmt, sort_name, key, models.Movie.id, descending, cursor=cursor, limit=limit)
+    rows = (await db.scalars(stmt)).all()
+    return pagination.page_result(rows, sort_name, limit, value_of)
+
+async def get_movie(db: AsyncSession, movie_id: int, refresh: bool = False):
+    stmt = (
+        select(models.Movie)
+        .options(selectinload(models.Movie.reviews))
+        .where(models.Movie.id == movie_id)
+    )
+    if refresh:
+        # 이미 세션에 있는 객체도 DB 값 + reviews 로 다시 채움
+        stmt = stmt.execution_options(populate_existing=True)
+    return (await db.scalars(stmt)).first()
+
+async def get_facets(db: AsyncSession):
+    value = genres.cached_facets()
+    if value is None:
+        value = genres.store_facets(await db.run_sync(genres.compute_facets))
+    return value
+
+async def search_movies(db: AsyncSession, q: str, skip: int = 0, limit: int = 20,
+                        genre: str = None, year: str = None):
+    return await db.run_sync(search.search_movies, q, skip=skip, limit=limit, genre=genre, year=year)
+
+async def create_movie(db: AsyncSession, movie: schemas.MovieCreate):
+    db_movie = models.Movie(**movie.model_dump())
+    db.add(db_movie)
+    await db.run_sync(crud._sync_derived, [db_movie])
+    await db.commit()
+    genres.invalidate_facets()
+    return await get_movie(db, db_movie.id, refresh=True)
+
+async def update_movie(db: AsyncSession, movie_id: int, movie_data: schemas.MovieCreate):
+    db_movie = await get_movie(db, movie_id)
+    if db_movie:
+        for key, value in movie_data.model_dump().items():
+            setattr(db_movie, key, value)
+        await db.run_sync(crud._sync_derived, [db_movie])
+        await db.commit()
+        genres.invalidate_facets()
+    return db_movie
+
+async def delete_movie(db: AsyncSession, movie_id: int):
+    db_movie = await db.get(models.Movie, movie_id)
+    if db_movie:
+        await db.run_sync(search.remove_movie, movie_id)
+        await db.delete(db_movie)
+        await db.commit()
+        genres.invalidate_facets()
+        return True
+    return False
+
+# Review CRUD
+async def _adjust_aggregates(db: AsyncSession, movie_id: int, count_delta: int, rating_delta: float):
+    # crud._adjust_aggregates 와 같은 UPDATE (commit 은 호출한 쪽에서)
+    new_count = models.Movie.review_count + count_delta
+    new_sum = models.Movie.rating_sum + rating_delta
+    await db.execute(
+        update(models.Movie)
+        .where(models.Movie.id == movie_id)
+        .values({
+            models.Movie.review_count: new_count,
+            models.Movie.rating_sum: new_sum,
+            models.Movie.rating_avg: case((new_count > 0, new_sum / new_count), else_=0.0),
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+async def get_reviews(db: AsyncSession, movie_id: int):
+    return (await db.scalars(select(models.Review).where(models.Review.movie_id == movie_id))).all()
+
+async def get_reviews_page(db: AsyncSession, movie_id: int, cursor: str = None, limit: int = 20):
+    """영화 리뷰 최신순 키셋 페이지. 반환값: (리뷰 목록, next_cursor, has_more)"""
+    stmt = select(models.Review).where(models.Review.movie_id == movie_id)
+    stmt = pagination.keyset_statement(stmt, "reviews:desc", models.Review.id, models.Review.id, True,
+                                       cursor=cursor, limit=limit)
+    rows = (await db.scalars(stmt)).all()
+    return pagination.page_result(rows, "reviews:desc", limit, lambda r: r.id)
+
+async def create_review(db: AsyncSession, movie_id: int, review: schemas.ReviewCreate):
+    author = review.author if review.author else "익명"
+    created_at = review.created_at if review.created_at else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    db_review = models.Review(
+        **review.model_dump(exclude={"author", "created_at"}),
+        movie_id=movie_id,
+        author=author,
+        created_at=created_at
+    )
+    # 감성 분석은 백그라운드 워커가 배치로 처리 (sentiment 는 분석 전까지 None)
+    sentiment_worker.mark_pending(db_review)
+    db.add(db_review)
+    await _adjust_aggregates(db, movie_id, 1, db_review.rating or 0.0)
+    await db.commit()
+    sentiment_worker.notify()
+    return db_review
+
+async def delete_review(db: AsyncSession, review_id: int):
+    db_review = await db.get(models.Review, review_id)
+    if db_review:
+        await _adjust_aggregates(db, db_review.movie_id, -1, -(db_review.rating or 0.0))
+        await db.delete(db_review)
+        await db.commit()
+        return True
+    return False
+
+async def update_review(db: AsyncSession, review_id: int, review_data: schemas.ReviewCreate):
+    db_review = await db.get(models.Review, review_id)
+    if db_review:
+        # 내용이 바뀌면 감성 분석도 다시 수행 (백그라운드 워커)
+        rescore = db_review.content != review_data.content
+        if rescore:
+            sentiment_worker.mark_pending(db_review)
+
+        old_rating = db_review.rating or 0.0
+        for key, value in review_data.model_dump().items():
+            if key != "sentiment":
+                setattr(db_review, key, value)
+        if (db_review.rating or 0.0) != old_rating:
+            await _adjust_aggregates(db, db_review.movie_id, 0, (db_review.rating or 0.0) - old_rating)
+        await db.commit()
+        if rescore:
+            sentiment_worker.notify()
+    return db_review
+
+async def get_sentiment_metrics(db: AsyncSession):
+    return await db.run_sync(sentiment_worker.worker.metrics)
@@ -1,15 +1,44 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # sqlite 데이터베이스 연결
 SQLALCHEMY_DATABASE_URL = "sqlite:///./movies.db"
+# 같은 파일을 aiosqlite 드라이버로 (FastAPI 엔드포인트용 비동기 연결)
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./movies.db"
+
+# 연결할 때마다 적용하는 SQLite 설정
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # 쓰는 동안에도 읽기가 막히지 않음
+    "synchronous": "NORMAL",    # WAL 에서는 NORMAL 로도 손상 없이 안전 (커밋마다 fsync 하지 않음)
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", 64 * 1024)),  # 음수 = KB 단위
+    "temp_store": "MEMORY",
+}
 
-engine = create_engine(
+def apply_sqlite_pragmas(engine):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return engine
+
+engine = apply_sqlite_pragmas(create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+))
 
-# 데이터베이스 세션 생성
+# 데이터베이스 세션 생성 (마이그레이션 / 초기 데이터 / 점검 스크립트용)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진 + 세션 (PRAGMA 는 내부 sync_engine 의 connect 이벤트로 똑같이 적용)
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+apply_sqlite_pragmas(async_engine.sync_engine)
+# commit 후에도 응답 직렬화에서 속성을 읽을 수 있도록 expire 하지 않음 (비동기에서는 lazy load 불가)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # 데이터베이스 모델 생성
 Base = declarative_base()
@@ -0,0 +1,129 @@
+"""
+🎭 장르 정규화 (genres / movie_genres 다대다 테이블) + 필터 옵션 집계(/facets)
+
+- Movie.genre 는 "범죄, 드라마" 같은 표시용 문자열로 그대로 두고,
+  쉼표로 나눈 장르를 genres 테이블에 넣어 movie_genres 로 연결합니다. (장르 필터가 인덱스를 탐)
+- 장르/개봉년도별 영화 수는 SQL GROUP BY 로 계산하고, 영화가 바뀔 때까지(최대 FACETS_TTL 초) 캐시합니다.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+import models
+
+# 여러 uvicorn 워커를 띄우면 다른 워커의 변경은 알 수 없으므로 TTL 도 함께 사용
+FACETS_TTL = float(os.getenv("FACETS_TTL", 60))
+
+_facets_cache = {"value": None, "expires": 0.0}
+_facets_lock = threading.Lock()
+
+
+def split_genres(value):
+    """'범죄, 드라마' → ['범죄', '드라마'] (공백 제거, 중복 제거, 순서 유지)"""
+    names = []
+    for name in (value or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def genre_filter(name):
+    """장르 이름으로 영화 id 를 찾는 서브쿼리 (Movie.id.in_(...) 에 사용)"""
+    return (
+        select(models.movie_genres.c.movie_id)
+        .join(models.Genre, models.Genre.id == models.movie_genres.c.genre_id)
+        .where(models.Genre.name == name.strip())
+    )
+
+
+def sync_movie_genres(db: Session, movie):
+    """movie.genre 문자열에 맞게 movie.genres 연결을 갱신합니다. (commit 은 호출한 쪽에서)"""
+    names = split_genres(movie.genre)
+    existing = {g.name: g for g in db.query(models.Genre).filter(models.Genre.name.in_(names))} if names else {}
+    missing = [name for name in names if name not in existing]
+    for name in missing:
+        existing[name] = models.Genre(name=name)
+        db.add(existing[name])
+    if missing:
+        # 같은 트랜잭션에서 다음 영화가 같은 장르를 또 만들지 않도록 바로 INSERT
+        db.flush()
+    movie.genres = [existing[name] for name in names]
+
+
+def backfill(db: Session):
+    """movies.genre 문자열 전체를 나눠서 genres / movie_genres 를 다시 만듭니다. 반환값: (장르 수, 연결 수)"""
+    rows = db.execute(text("SELECT id, genre FROM movies")).fetchall()
+    pairs = [(movie_id, name) for movie_id, genre in rows for name in split_genres(genre)]
+
+    db.execute(text("DELETE FROM movie_genres"))
+    if pairs:
+        db.execute(
+            text("INSERT OR IGNORE INTO genres (name) VALUES (:name)"),
+            [{"name": name} for name in sorted({name for _, name in pairs})],
+        )
+        ids = dict(db.execute(text("SELECT name, id FROM genres")).fetchall())
+        db.execute(
+            text("INSERT OR IGNORE INTO movie_genres (movie_id, genre_id) VALUES (:movie_id, :genre_id)"),
+            [{"movie_id": movie_id, "genre_id": ids[name]} for movie_id, name in pairs],
+        )
+    # 더 이상 쓰이지 않는 장르 정리
+    db.execute(text("DELETE FROM genres WHERE id NOT IN (SELECT genre_id FROM movie_genres)"))
+    db.commit()
+    invalidate_facets()
+    return len({name for _, name in pairs}), len(pairs)
+
+
+# ===============================
+# 필터 옵션 집계 (/facets)
+# ===============================
+def compute_facets(db: Session):
+    genre_rows = (
+        db.query(models.Genre.name, func.count(models.movie_genres.c.movie_id).label("count"))
+        .join(models.movie_genres, models.movie_genres.c.genre_id == models.Genre.id)
+        .group_by(models.Genre.id)
+        .order_by(func.count(models.movie_genres.c.movie_id).desc(), models.Genre.name)
+        .all()
+    )
+    year_rows = (
+        db.query(models.Movie.release_year, func.count(models.Movie.id))
+        .filter(models.Movie.release_year.isnot(None))
+        .group_by(models.Movie.release_year)
+        .order_by(models.Movie.release_year.desc())
+        .all()
+    )
+    return {
+        "genres": [{"name": name, "count": count} for name, count in genre_rows],
+        "years": [{"year": year, "count": count} for year, count in year_rows],
+        "total": db.query(func.count(models.Movie.id)).scalar(),
+    }
+
+
+def cached_facets():
+    """캐시된 집계 (없거나 만료됐으면 None)"""
+    with _facets_lock:
+        if _facets_cache["value"] is not None and time.monotonic() < _facets_cache["expires"]:
+            return _facets_cache["value"]
+    return None
+
+
+def store_facets(value):
+    with _facets_lock:
+        _facets_cache["value"] = value
+        _facets_cache["expires"] = time.monotonic() + FACETS_TTL
+    return value
+
+
+def get_facets(db: Session):
+    value = cached_facets()
+    if value is None:
+        value = store_facets(compute_facets(db))
+    return value
+
+
+def invalidate_facets():
+    with _facets_lock:
+        _facets_cache["value"] = None
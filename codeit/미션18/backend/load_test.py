@@ -0,0 +1,130 @@
+"""
+🏋️ 부하 테스트: 리뷰 등록이 몰릴 때 읽기 응답 시간 (비동기 변경 전 vs 후)
+
+읽기 스레드는 GET /movies 와 GET /movies/{id} 를 계속 호출하고,
+쓰기 스레드는 동시에 POST /movies/{id}/reviews 를 보냅니다.
+서버별로 읽기 p50 / p95 / p99 / 최대 응답 시간과 처리량을 비교합니다.
+
+📌 실행 방법 (변경 전 코드는 git worktree 로 따로 꺼내서 띄움):
+git worktree add /tmp/movies-before <비동기 변경 전 커밋>   # 예: git log --grep user-023 으로 찾은 커밋
+(cd /tmp/movies-before/codeit/미션18/backend && uvicorn main:app --port 8001)   # 변경 전 (def 엔드포인트 + sync Session)
+(cd codeit/미션18/backend && uvicorn main:app --port 8000)                      # 변경 후 (async def + AsyncSession)
+python load_test.py --url http://localhost:8001 --url http://localhost:8000 --duration 30
+git worktree remove /tmp/movies-before
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+READERS = 16
+WRITERS = 4
+
+
+class BadStatus(Exception):
+    """2xx 가 아닌 응답 (오류로 세고 응답 시간에는 넣지 않음)"""
+
+
+def request(method, url, body=None, timeout=60):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            status, payload = res.status, res.read()
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, e.read()
+    if not 200 <= status < 300:
+        raise BadStatus(f"{method} {status}")
+    return time.perf_counter() - start, payload
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run(base_url, duration, readers, writers):
+    _, payload = request("GET", f"{base_url}/movies?limit=20")
+    movie_ids = [m["id"] for m in json.loads(payload)["movies"]]
+    if not movie_ids:
+        raise SystemExit(f"{base_url} 에 영화가 없습니다. (/set3movies 로 초기 데이터를 넣어 주세요)")
+
+    stop = time.monotonic() + duration
+    reads, writes, errors = [], [], Counter()
+    lock = threading.Lock()
+
+    def reader(n):
+        i = n
+        while time.monotonic() < stop:
+            movie_id = movie_ids[i % len(movie_ids)]
+            url = f"{base_url}/movies?limit=20" if i % 2 else f"{base_url}/movies/{movie_id}"
+            i += 1
+            try:
+                elapsed, _ = request("GET", url)
+                with lock:
+                    reads.append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors[str(e) if isinstance(e, BadStatus) else f"GET {type(e).__name__}"] += 1
+
+    def writer(n):
+        i = n
+        while time.monotonic() < stop:
+            movie_id = movie_ids[i % len(movie_ids)]
+            body = {"author": "부하테스트", "content": f"부하 테스트 리뷰 {i}: 연출이 좋았고 배우 연기도 훌륭했어요.",
+                    "rating": float(i % 11), "created_at": ""}
+            i += 1
+            try:
+                elapsed, payload = request("POST", f"{base_url}/movies/{movie_id}/reviews", body)
+                review_id = json.loads(payload)["id"]
+                with lock:
+                    writes.append(elapsed)
+                # 테스트 리뷰는 바로 지워서 DB 를 원래대로 (삭제 시간은 측정하지 않음)
+                request("DELETE", f"{base_url}/reviews/{review_id}")
+            except Exception as e:
+                with lock:
+                    errors[str(e) if isinstance(e, BadStatus) else f"POST/DELETE {type(e).__name__}"] += 1
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return reads, writes, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 쓰기 부하 중 읽기 지연 시간 비교")
+    parser.add_argument("--url", action="append", help="서버 주소 (여러 번 지정하면 차례로 측정)")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--readers", type=int, default=READERS)
+    parser.add_argument("--writers", type=int, default=WRITERS)
+    args = parser.parse_args()
+    urls = args.url or ["http://localhost:8001", "http://localhost:8000"]
+
+    print(f"⏱ 서버별 {args.duration:.0f}초, 읽기 {args.readers} / 쓰기 {args.writers} 스레드\n")
+    print(f"{'서버':<26}{'읽기 수':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}"
+          f"{'쓰기 수':>8}{'쓰기 p50(ms)':>14}{'오류':>6}")
+    for url in urls:
+        base_url = url.rstrip("/")
+        reads, writes, errors = run(base_url, args.duration, args.readers, args.writers)
+        ms = lambda values, p: percentile(values, p) * 1000
+        print(f"{base_url:<26}{len(reads):>8}{ms(reads, 50):>10.1f}{ms(reads, 95):>10.1f}{ms(reads, 99):>10.1f}"
+              f"{max(reads, default=0) * 1000:>10.1f}{len(writes):>8}"
+              f"{(statistics.median(writes) * 1000 if writes else 0):>14.1f}{sum(errors.values()):>6}")
+        for error, count in errors.most_common():
+            print(f"   ⚠️ {error}: {count}건")
+        if not writes:
+            print("   ⚠️ 성공한 쓰기가 없어서 쓰기 부하 없이 측정된 결과입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
-from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import FastAPI, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 import uvicorn
 from contextlib import asynccontextmanager
 
-import database, models, schemas, crud
+import database, models, schemas, crud, crud_async, migrations, pagination, sentiment_worker
 
-# DB 테이블 생성
-models.Base.metadata.create_all(bind=database.engine)
+# DB 테이블 생성 + 예전 DB 면 컬럼/인덱스 추가 (migrations.py)
+migrations.upgrade(database.engine)
 
 # Lifespan 관리 (startup/shutdown)
 @asynccontextmanager
@@ -18,91 +18,140 @@ async def lifespan(app: FastAPI):
         crud.init_db(db)
     finally:
         db.close()
+    # 리뷰 감성 분석 백그라운드 워커 (SENTIMENT_WORKERS=0 이면 이 프로세스에서는 분석하지 않음)
+    sentiment_worker.worker.start()
     yield
+    sentiment_worker.worker.stop()
+    await database.async_engine.dispose()
 
 app = FastAPI(lifespan=lifespan)
 
-# DB 세션 의존성
-def get_db():
-    db = database.SessionLocal()
-    try:
+# DB 세션 의존성 (비동기 세션 - 쿼리를 기다리는 동안 이벤트 루프가 다른 요청을 처리)
+async def get_db():
+    async with database.AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"status": "ok", "mode": "database_refactored"}
 
 # 초기화 수동 트리거 (기존 기능 유지)
 @app.post("/set3movies")
-def set3movies(db: Session = Depends(get_db)):
-    crud.init_db(db)
+async def set3movies(db: AsyncSession = Depends(get_db)):
+    await db.run_sync(crud.init_db)
     return {"message": "3 movies set successfully or already exist"}
 
 # 영화 목록 조회
-@app.get("/movies_all", response_model=List[schemas.Movie])
-def get_movies_all(db: Session = Depends(get_db)):
-    return crud.get_movies_all(db)
-
-@app.get("/movies", response_model=List[schemas.Movie])
-def get_movies(
-    skip: int = 0, 
-    limit: int = 100, 
+@app.get("/movies_all", response_model=List[schemas.MovieListItem])
+async def get_movies_all(db: AsyncSession = Depends(get_db)):
+    return await crud_async.get_movies_all(db)
+
+@app.get("/movies", response_model=schemas.MoviePage)
+async def get_movies(
+    cursor: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    sort: Literal["id", "rating", "release_date", "title"] = "id",
+    order: Optional[Literal["asc", "desc"]] = None,
     title: str = None, 
     genre: str = None, 
     director: str = None, 
     year: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    return crud.get_movies(db, skip=skip, limit=limit, title=title, genre=genre, director=director, year=year)
+    try:
+        movies, next_cursor, has_more = await crud_async.get_movies(
+            db, cursor=cursor, limit=limit, sort=sort, order=order,
+            title=title, genre=genre, director=director, year=year
+        )
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"movies": movies, "next_cursor": next_cursor, "has_more": has_more}
+
+# 필터 옵션 (장르 / 개봉년도별 영화 수) - 홈 화면이 전체 목록을 받지 않도록 SQL 로 집계 + 캐시
+@app.get("/facets", response_model=schemas.Facets)
+async def get_facets(db: AsyncSession = Depends(get_db)):
+    return await crud_async.get_facets(db)
+
+# 감성 분석 대기열 깊이 / 지연 시간
+@app.get("/metrics/sentiment", response_model=schemas.SentimentMetrics)
+async def sentiment_metrics(db: AsyncSession = Depends(get_db)):
+    return await crud_async.get_sentiment_metrics(db)
+
+# 영화 통합 검색 (제목/감독/장르, 관련도 순) - /movies/{movie_id} 보다 먼저 등록해야 함
+@app.get("/movies/search", response_model=schemas.MovieSearchResult)
+async def search_movies(
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    genre: str = None,
+    year: str = None,
+    db: AsyncSession = Depends(get_db)
+):
+    movies, mode = await crud_async.search_movies(db, q, skip=skip, limit=limit, genre=genre, year=year)
+    return {"mode": mode, "movies": movies}
 
 # 영화 상세 조회
 @app.get("/movies/{movie_id}", response_model=schemas.Movie)
-def get_movie(movie_id: int, db: Session = Depends(get_db)):
-    movie = crud.get_movie(db, movie_id)
+async def get_movie(movie_id: int, db: AsyncSession = Depends(get_db)):
+    movie = await crud_async.get_movie(db, movie_id)
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
     return movie
 
 # 영화 등록
 @app.post("/movies", response_model=schemas.Movie)
-def add_movie(movie: schemas.MovieCreate, db: Session = Depends(get_db)):
-    return crud.create_movie(db, movie)
+async def add_movie(movie: schemas.MovieCreate, db: AsyncSession = Depends(get_db)):
+    return await crud_async.create_movie(db, movie)
 
 # 영화 수정
 @app.put("/movies/{movie_id}", response_model=schemas.Movie)
-def update_movie(movie_id: int, movie_data: schemas.MovieCreate, db: Session = Depends(get_db)):
-    movie = crud.update_movie(db, movie_id, movie_data)
+async def update_movie(movie_id: int, movie_data: schemas.MovieCreate, db: AsyncSession = Depends(get_db)):
+    movie = await crud_async.update_movie(db, movie_id, movie_data)
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
     return movie
 
 # 영화 삭제
 @app.delete("/movies/{movie_id}")
-def delete_movie(movie_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_movie(db, movie_id)
+async def delete_movie(movie_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud_async.delete_movie(db, movie_id)
     if not success:
         raise HTTPException(status_code=404, detail="Movie not found")
     return {"message": "Movie deleted successfully"}
 
+# 영화 리뷰 목록 (최신순, 커서 페이지네이션)
+@app.get("/movies/{movie_id}/reviews", response_model=schemas.ReviewPage)
+async def get_reviews(
+    movie_id: int,
+    cursor: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    if await db.get(models.Movie, movie_id) is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    try:
+        reviews, next_cursor, has_more = await crud_async.get_reviews_page(db, movie_id, cursor=cursor, limit=limit)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"reviews": reviews, "next_cursor": next_cursor, "has_more": has_more}
+
 # 리뷰 등록
 @app.post("/movies/{movie_id}/reviews", response_model=schemas.Review)
-def add_review(movie_id: int, review: schemas.ReviewCreate, db: Session = Depends(get_db)):
-    return crud.create_review(db, movie_id, review)
+async def add_review(movie_id: int, review: schemas.ReviewCreate, db: AsyncSession = Depends(get_db)):
+    return await crud_async.create_review(db, movie_id, review)
 
 # 리뷰 삭제
 @app.delete("/reviews/{review_id}")
-def delete_review(review_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_review(db, review_id)
+async def delete_review(review_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud_async.delete_review(db, review_id)
     if not success:
         raise HTTPException(status_code=404, detail="Review not found")
     return {"message": "Review deleted successfully"}
 
 # 리뷰 수정
 @app.put("/reviews/{review_id}", response_model=schemas.Review)
-def update_review(review_id: int, review: schemas.ReviewCreate, db: Session = Depends(get_db)):
-    updated_review = crud.update_review(db, review_id, review)
+async def update_review(review_id: int, review: schemas.ReviewCreate, db: AsyncSession = Depends(get_db)):
+    updated_review = await crud_async.update_review(db, review_id, review)
     if updated_review is None:
         raise HTTPException(status_code=404, detail="Review not found")
     return updated_review
@@ -0,0 +1,122 @@
+"""
+🗂 movies.db 스키마 마이그레이션
+
+create_all 은 새 테이블만 만들고 기존 테이블에 컬럼/인덱스를 추가하지 않으므로,
+예전 movies.db 를 최신 스키마로 올리는 단계를 순서대로 적어 둡니다.
+적용한 버전은 SQLite 의 PRAGMA user_version 에 기록해서 한 번씩만 실행합니다.
+
+📌 실행 방법 (backend 폴더에서, 서버 시작 시에도 자동 실행됨):
+python migrations.py
+"""
+import os
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import aggregates, database, genres, models, search
+
+
+def _add_column(conn, table, name, ddl):
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    if name in existing:
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+    return True
+
+
+def _review_aggregates(engine):
+    """1. 영화별 리뷰 수 / 점수 합 컬럼"""
+    if aggregates.ensure_columns(engine):
+        with Session(engine) as db:
+            aggregates.backfill(db)
+
+
+def _release_year_and_indexes(engine):
+    """2. release_year 컬럼 + 필터/조인에 쓰는 인덱스"""
+    with engine.begin() as conn:
+        _add_column(conn, "movies", "release_year", "INTEGER")
+        conn.execute(text(
+            "UPDATE movies SET release_year = CAST(substr(release_date, 1, 4) AS INTEGER) "
+            "WHERE substr(release_date, 1, 4) GLOB '[0-9][0-9][0-9][0-9]'"
+        ))
+        # 이름은 models 의 index=True 가 만드는 이름과 같게 (새 DB 와 마이그레이션한 DB 의 스키마 일치)
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_release_year ON movies (release_year)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reviews_movie_id ON reviews (movie_id)"))
+        # 쿼리 플래너가 인덱스를 고를 수 있도록 통계 갱신
+        conn.execute(text("ANALYZE"))
+
+
+def _movie_search_index(engine):
+    """3. 제목/감독/장르 FTS5 색인"""
+    with engine.begin() as conn:
+        search.create_table(conn)
+    with Session(engine) as db:
+        search.rebuild(db)
+
+
+def _normalized_genres(engine):
+    """4. genres / movie_genres 테이블 (create_all 로 생성됨) 을 기존 genre 문자열로 채움"""
+    with Session(engine) as db:
+        genres.backfill(db)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def _sort_indexes(engine):
+    """5. 키셋 페이지네이션용 평균 평점 컬럼 + (정렬 키, id) 인덱스"""
+    aggregates.ensure_columns(engine)
+    with Session(engine) as db:
+        aggregates.backfill(db)
+    with engine.begin() as conn:
+        # models 의 Index 정의와 같은 식 (식이 다르면 플래너가 인덱스를 쓰지 못함)
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_rating_avg ON movies (rating_avg, id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_release_sort ON movies (coalesce(release_date, ''), id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_title_sort ON movies (coalesce(title, ''), id)"))
+        conn.execute(text("ANALYZE"))
+
+
+def _sentiment_queue(engine):
+    """6. 감성 분석 대기열 컬럼 (분석 전 리뷰 표시 + 대기 시간 측정)"""
+    with engine.begin() as conn:
+        _add_column(conn, "reviews", "sentiment_queued_at", "FLOAT")
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reviews_sentiment_queued_at ON reviews (sentiment_queued_at)"))
+
+
+# (버전, 설명, 함수) - 새 마이그레이션은 항상 맨 뒤에 추가
+MIGRATIONS = [
+    (1, "리뷰 집계 컬럼", _review_aggregates),
+    (2, "release_year 컬럼 + 인덱스", _release_year_and_indexes),
+    (3, "영화 전문 검색 색인 (FTS5)", _movie_search_index),
+    (4, "장르 정규화 테이블", _normalized_genres),
+    (5, "정렬/페이지네이션 인덱스", _sort_indexes),
+    (6, "감성 분석 대기열", _sentiment_queue),
+]
+
+
+def current_version(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def upgrade(engine=database.engine):
+    """테이블을 만들고 아직 적용하지 않은 마이그레이션을 실행합니다. 반환값: 적용한 버전 목록"""
+    models.Base.metadata.create_all(bind=engine)
+    version = current_version(engine)
+    applied = []
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        print(f"🗂 마이그레이션 {target}: {description}")
+        migrate(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+        applied.append(target)
+    return applied
+
+
+if __name__ == "__main__":
+    applied = upgrade()
+    print(f"✅ 스키마 버전 {current_version(database.engine)}" + (f" (적용: {applied})" if applied else " (변경 없음)"))
@@ -1,7 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey,Date
+from sqlalchemy import Column, Integer, String, Float, ForeignKey,Date, Table, Index, func, literal_column
 from database import Base
 
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+
+def parse_year(value):
+    """'YYYY-MM-DD' / 'YYYY' → YYYY (정수), 해석할 수 없으면 None"""
+    value = (value or "").strip()[:4]
+    return int(value) if value.isdigit() else None
+
+# 영화 - 장르 다대다 연결 테이블 (장르 → 영화 방향 조회용 인덱스)
+movie_genres = Table(
+    "movie_genres", Base.metadata,
+    Column("movie_id", Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True),
+    Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True),
+    Index("ix_movie_genres_genre_id", "genre_id", "movie_id"),
+)
+
+class Genre(Base):
+    __tablename__ = "genres"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True, index=True)
+
+    movies = relationship("Movie", secondary=movie_genres, back_populates="genres")
 
 class Movie(Base):
     __tablename__ = "movies"
@@ -11,19 +31,47 @@ class Movie(Base):
     genre = Column(String)
     poster_url = Column(String)
     release_date = Column(String, nullable=True) # YYYY-MM-DD 형식
+    # 개봉년도 필터용 (release_date 문자열 대신 인덱스를 타는 정수 컬럼, release_date 가 바뀌면 자동 갱신)
+    release_year = Column(Integer, nullable=True, index=True)
+
+    # 리뷰 집계값 (리뷰 등록/수정/삭제 시 같은 트랜잭션에서 갱신 → 목록 조회 때 GROUP BY 불필요)
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    # 평점순 정렬/페이지네이션용 평균 (rating_sum / review_count 를 함께 갱신, 인덱스 있음)
+    rating_avg = Column(Float, nullable=False, default=0.0, server_default="0")
 
     # 1:N 관계 (영화 하나에 리뷰 여러 개)
     reviews = relationship("Review", back_populates="movie", cascade="all, delete-orphan")
+    # N:M 관계 (genre 문자열을 나눈 정규화 장르, genres.py 에서 동기화)
+    genres = relationship("Genre", secondary=movie_genres, back_populates="movies")
+
+    @validates("release_date")
+    def _sync_release_year(self, key, value):
+        self.release_year = parse_year(value)
+        return value
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.review_count, 1) if self.review_count else 0.0
+
+# 목록 정렬 키 (NULL 없이 비교할 수 있도록 coalesce) + 같은 식으로 만든 (정렬 키, id) 인덱스
+RELEASE_SORT_KEY = func.coalesce(Movie.__table__.c.release_date, literal_column("''"))
+TITLE_SORT_KEY = func.coalesce(Movie.__table__.c.title, literal_column("''"))
+Index("ix_movies_rating_avg", Movie.__table__.c.rating_avg, Movie.__table__.c.id)
+Index("ix_movies_release_sort", RELEASE_SORT_KEY, Movie.__table__.c.id)
+Index("ix_movies_title_sort", TITLE_SORT_KEY, Movie.__table__.c.id)
 
 class Review(Base):
     __tablename__ = "reviews"
     id = Column(Integer, primary_key=True, index=True)
-    movie_id = Column(Integer, ForeignKey("movies.id"))
+    movie_id = Column(Integer, ForeignKey("movies.id"), index=True)
     author = Column(String)
     content = Column(String)
     rating = Column(Float)
     sentiment = Column(String, nullable=True) 
     created_at = Column(String)
+    # 감성 분석 대기 중이면 등록(수정) 시각 (time.time()), 분석이 끝나면 NULL (sentiment_worker.py)
+    sentiment_queued_at = Column(Float, nullable=True, index=True)
 
     # N:1 관계 (리뷰는 한 영화에 속함)
     movie = relationship("Movie", back_populates="reviews")
@@ -0,0 +1,79 @@
+"""
+📄 키셋(커서) 페이지네이션
+
+offset 은 앞 페이지 행을 모두 읽고 버리므로 뒤로 갈수록 느려집니다.
+대신 (정렬 키, id) 인덱스에서 "마지막으로 본 행 다음"부터 limit 개만 읽습니다.
+커서는 마지막 행의 (정렬 키 값, id) 를 base64 로 감싼 문자열이라 클라이언트는 내용을 몰라도 됩니다.
+"""
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort, value, row_id):
+    raw = json.dumps({"s": sort, "v": value, "id": row_id}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """커서 → (정렬 키 값, id). 형식이 틀리거나 다른 정렬로 만든 커서면 InvalidCursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        value, row_id = data["v"], data["id"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise InvalidCursor("잘못된 커서입니다.")
+    # 값은 그대로 SQL 바인드 파라미터가 되므로 SQLite 가 받을 수 있는 스칼라만 허용 (dict/list 면 500 오류)
+    if (not isinstance(value, (str, int, float, type(None))) or isinstance(value, bool)
+            or not isinstance(row_id, int) or isinstance(row_id, bool)):
+        raise InvalidCursor("잘못된 커서입니다.")
+    if data.get("s") != sort:
+        raise InvalidCursor("정렬 기준이 다른 커서입니다.")
+    return value, row_id
+
+
+def keyset_statement(query, sort, key, id_column, descending, cursor=None, limit=20):
+    """커서 조건 + 정렬 + limit(+1) 을 붙입니다. (ORM Query / select() 둘 다 사용 가능)
+
+    key: 정렬 키 SQL 식 (NULL 이 없어야 함)
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        # (key, id) < (v, id) 를 풀어 쓴 형태: 앞의 key <= v 로 인덱스 범위 탐색을 시작
+        # (SQLite 는 식 인덱스(coalesce(...))에는 행 값 비교 (key, id) < (v, id) 로 범위 탐색을 못 함)
+        if descending:
+            query = query.where(and_(key <= value, or_(key < value, id_column < row_id)))
+        else:
+            query = query.where(and_(key >= value, or_(key > value, id_column > row_id)))
+
+    if descending:
+        query = query.order_by(key.desc(), id_column.desc())
+    else:
+        query = query.order_by(key.asc(), id_column.asc())
+
+    # 1개 더 읽어서 다음 페이지가 있는지 확인
+    return query.limit(limit + 1)
+
+
+def page_result(rows, sort, limit, value_of):
+    """limit + 1 개까지 읽은 행 → (행 목록, next_cursor, has_more)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(sort, value_of(rows[-1]), rows[-1].id) if has_more else None
+    return rows, next_cursor, has_more
+
+
+def keyset_page(query, sort, key, id_column, descending, cursor=None, limit=20, value_of=None):
+    """정렬 키 + id 로 정렬된 한 페이지를 가져옵니다.
+
+    value_of: 행 → 커서에 넣을 정렬 키 값
+    반환값: (행 목록, next_cursor, has_more)
+    """
+    rows = keyset_statement(query, sort, key, id_column, descending, cursor, limit).all()
+    return page_result(rows, sort, limit, value_of)
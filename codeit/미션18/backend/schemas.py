@@ -32,6 +32,60 @@ class MovieCreate(MovieBase):
 class Movie(MovieBase):
     id: int
     reviews: List[Review] = []
+    review_count: int = 0
     average_rating: float = 0.0
     
     model_config = ConfigDict(from_attributes=True)
+
+# 목록 조회용 (리뷰 본문 없이 집계값만 → 영화마다 리뷰를 불러오는 추가 SELECT 없음)
+class MovieListItem(MovieBase):
+    id: int
+    review_count: int = 0
+    average_rating: float = 0.0
+
+    model_config = ConfigDict(from_attributes=True)
+
+# 통합 검색 결과 (mode: "fts" = 전문 검색 색인 bm25 순 / "filter" = 짧은 검색어라 ilike 로 대체)
+class MovieSearchResult(BaseModel):
+    mode: str
+    movies: List[MovieListItem] = []
+
+# --- Facet Schemas (홈 화면 필터 옵션) ---
+class GenreFacet(BaseModel):
+    name: str
+    count: int
+
+class YearFacet(BaseModel):
+    year: int
+    count: int
+
+class Facets(BaseModel):
+    genres: List[GenreFacet] = []
+    years: List[YearFacet] = []
+    total: int = 0
+
+# --- Page Schemas (키셋 페이지네이션) ---
+class MoviePage(BaseModel):
+    movies: List[MovieListItem] = []
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+class ReviewPage(BaseModel):
+    reviews: List[Review] = []
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+# --- 감성 분석 대기열 지표 (sentiment_worker.py) ---
+class SentimentMetrics(BaseModel):
+    pending: int = 0                     # 대기열 깊이 (분석 전 리뷰 수)
+    oldest_pending_seconds: float = 0.0  # 가장 오래 기다린 리뷰의 대기 시간
+    workers: int = 0
+    in_flight: int = 0
+    batches: int = 0
+    scored: int = 0
+    stale: int = 0
+    failures: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    last_lag_seconds: float = 0.0        # 마지막 배치: 대기열에 들어간 뒤 결과가 저장되기까지
+    max_lag_seconds: float = 0.0
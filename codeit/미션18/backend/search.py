@@ -0,0 +1,116 @@
+"""
+🔍 영화 제목/감독/장르 전문 검색 (SQLite FTS5, trigram 토크나이저)
+
+- ilike '%x%' 는 인덱스를 못 타서 항상 전체 스캔 → FTS5 trigram 색인으로 부분 문자열 검색
+- 한글은 띄어쓰기가 제각각이고("해리 포터" / "해리포터"), 입력기에 따라 자모가 분리(NFD)되어 들어오므로
+  색인/검색어 모두 NFC 정규화 + 공백 제거 + 소문자로 맞춘 뒤 비교
+- trigram 은 3글자 미만 검색어를 찾지 못하므로 그때는 기존 ilike 필터로 대체
+- 색인은 crud 의 create_movie / update_movie / delete_movie 가 같은 트랜잭션에서 갱신
+"""
+import re
+import unicodedata
+
+from sqlalchemy import Float, Integer, text
+from sqlalchemy.orm import Session
+
+import models
+
+FTS_TABLE = "movies_fts"
+FTS_COLUMNS = ("title", "director", "genre")
+# bm25 가중치 (제목 > 감독 > 장르)
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+MIN_QUERY_LENGTH = 3  # trigram 최소 길이
+
+
+def normalize(value):
+    """NFC 정규화 + 공백 제거 + 소문자"""
+    return re.sub(r"\s+", "", unicodedata.normalize("NFC", value or "")).lower()
+
+
+def create_table(conn):
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='trigram')"
+    ))
+
+
+def match_expression(query, column=None):
+    """검색어 → FTS5 MATCH 식. 정규화 후 3글자 미만이면 None (FTS 로 찾을 수 없음)"""
+    term = normalize(query)
+    if len(term) < MIN_QUERY_LENGTH:
+        return None
+    phrase = '"' + term.replace('"', '""') + '"'
+    return f"{column} : {phrase}" if column else phrase
+
+
+def matching_ids(match, param="fts_match"):
+    """MATCH 식에 맞는 영화 id 서브쿼리 (Movie.id.in_(...) 에 사용)"""
+    return text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :{param}").bindparams(
+        **{param: match}
+    ).columns(rowid=Integer)
+
+
+def ranked_ids(match):
+    """MATCH 식에 맞는 (movie_id, rank) 서브쿼리, rank 가 작을수록 관련도 높음"""
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return text(
+        f"SELECT rowid AS movie_id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query"
+    ).bindparams(fts_query=match).columns(movie_id=Integer, rank=Float).subquery("fts")
+
+
+# ===============================
+# 색인 갱신 (commit 은 호출한 쪽에서)
+# ===============================
+def index_movie(db: Session, movie):
+    remove_movie(db, movie.id)
+    db.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, title, director, genre) VALUES (:id, :title, :director, :genre)"),
+        {"id": movie.id, "title": normalize(movie.title),
+         "director": normalize(movie.director), "genre": normalize(movie.genre)},
+    )
+
+
+def remove_movie(db: Session, movie_id: int):
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": movie_id})
+
+
+def rebuild(db: Session, batch_size=5000):
+    """movies 테이블 전체로 색인을 다시 만듭니다. 반환값: 색인한 영화 수"""
+    db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    rows = db.execute(text("SELECT id, title, director, genre FROM movies")).fetchall()
+    for start in range(0, len(rows), batch_size):
+        db.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, title, director, genre) VALUES (:id, :title, :director, :genre)"),
+            [{"id": r.id, "title": normalize(r.title), "director": normalize(r.director), "genre": normalize(r.genre)}
+             for r in rows[start:start + batch_size]],
+        )
+    db.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"))
+    db.commit()
+    return len(rows)
+
+
+# ===============================
+# 검색
+# ===============================
+def search_movies(db: Session, q: str, skip: int = 0, limit: int = 20,
+                  genre: str = None, year: str = None):
+    """제목/감독/장르 통합 검색. FTS 로 찾을 수 있으면 bm25 순, 아니면 기존 ilike 필터로 대체"""
+    import crud
+
+    match = match_expression(q)
+    if match is None:
+        # 짧은 검색어: 제목 또는 감독에 부분 일치 (기존 필터 방식)
+        term = f"%{q.strip()}%"
+        query = crud.movies_query(db, genre=genre, year=year).filter(
+            models.Movie.title.ilike(term) | models.Movie.director.ilike(term)
+        ).order_by(models.Movie.id)
+        return query.offset(skip).limit(limit).all(), "filter"
+
+    fts = ranked_ids(match)
+    query = (
+        crud.movies_query(db, genre=genre, year=year)
+        .join(fts, fts.c.movie_id == models.Movie.id)
+        .order_by(fts.c.rank, models.Movie.id)
+    )
+    return query.offset(skip).limit(limit).all(), "fts"
@@ -47,23 +47,46 @@ def ml_sentiment(text: str):
         return "중립", 0.0
     
     try:
-        result = pipe(text)[0]
-        label = result['label']  # '1 star' ~ '5 stars'
-        score = result['score']  # 신뢰도
-
-        stars = int(label.split()[0])
-        if stars >= 4: return "긍정", score
-        elif stars == 3: return "중립", score
-        else: return "부정", score
+        return _star_label(pipe(text, truncation=True)[0])
     except:
         return "중립", 0.0
 
+def _star_label(result):
+    label = result['label']  # '1 star' ~ '5 stars'
+    score = result['score']  # 신뢰도
+
+    stars = int(label.split()[0])
+    if stars >= 4: return "긍정", score
+    elif stars == 3: return "중립", score
+    else: return "부정", score
+
+def ml_sentiment_batch(texts, batch_size=16):
+    """ml_sentiment 의 배치 버전 (여러 리뷰를 한 번의 모델 호출로). 반환값: [(라벨, 신뢰도), ...]"""
+    pipe = get_ml_pipeline()
+    if not pipe:
+        return [("중립", 0.0)] * len(texts)
+    try:
+        return [_star_label(r) for r in pipe(list(texts), batch_size=batch_size, truncation=True)]
+    except Exception as e:
+        # 배치 중 하나가 문제면 한 건씩 다시 (나머지 리뷰 결과는 살림)
+        print(f"배치 분석 오류, 한 건씩 다시 시도: {e}")
+        return [ml_sentiment(text) for text in texts]
+
 def analyze_sentiment(content: str):
     """Hybrid 감성 분석: 로컬 모델 + GPT-5-mini 보조"""
     
     # 1. 로컬 모델로 먼저 분석
     ml_label, ml_score = ml_sentiment(content)
+    return refine_sentiment(content, ml_label, ml_score)
+
+def analyze_sentiment_batch(contents, batch_size=16):
+    """analyze_sentiment 의 배치 버전 (로컬 모델은 한 번에, GPT 보조는 필요한 리뷰만)"""
+    return [
+        refine_sentiment(content, ml_label, ml_score)
+        for content, (ml_label, ml_score) in zip(contents, ml_sentiment_batch(contents, batch_size))
+    ]
 
+def refine_sentiment(content: str, ml_label: str, ml_score: float):
     # 2. 신뢰도가 낮거나 부정확할 가능성이 있을 때만 GPT 호출
     if (ml_score < 0.85 or ml_label == "부정") and client:
         try:
@@ -0,0 +1,264 @@
+"""
+🧠 리뷰 감성 분석 백그라운드 워커
+
+리뷰 등록/수정 요청은 감성 분석을 기다리지 않고 sentiment_queued_at(대기 시작 시각)만 표시해서 바로 응답합니다.
+워커 스레드가 대기 중인 리뷰를 batch_size 개씩 모아 BERT 로 한 번에 분석하고 결과를 reviews 테이블에 씁니다.
+- 대기열은 reviews 테이블 자체 (sentiment_queued_at IS NOT NULL) → 서버가 재시작돼도 대기 중인 리뷰가 남아 있음
+- 분석하는 동안 리뷰가 다시 수정되면 sentiment_queued_at 이 바뀌므로 예전 내용의 결과는 버림
+- 다른 프로세스(rescore 명령, 다른 uvicorn 워커)가 넣은 리뷰도 poll_interval 마다 확인
+
+📌 실행 방법 (backend 폴더에서):
+python sentiment_worker.py status             # 대기 리뷰 수 / 가장 오래 기다린 시간
+python sentiment_worker.py rescore            # 기존 리뷰 전체 다시 분석
+python sentiment_worker.py rescore --missing  # 감성 값이 없는 리뷰만 분석
+python sentiment_worker.py run                # 워커만 따로 실행 (서버는 SENTIMENT_WORKERS=0)
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import database, models
+
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", 1))  # 0 이면 이 프로세스에서는 분석하지 않음
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 16))
+SENTIMENT_MAX_WAIT = float(os.getenv("SENTIMENT_MAX_WAIT_MS", 50)) / 1000
+POLL_INTERVAL = float(os.getenv("SENTIMENT_POLL_INTERVAL", 5))
+
+
+def analyze_batch(contents):
+    # transformers / torch 는 분석할 때 처음 import (status 명령 등은 모델 없이 빠르게)
+    from sentiment import analyze_sentiment_batch
+    return analyze_sentiment_batch(contents, batch_size=SENTIMENT_BATCH_SIZE)
+
+
+# ===============================
+# 대기열 (reviews 테이블)
+# ===============================
+def mark_pending(review):
+    """리뷰를 분석 대기 상태로 (commit 은 호출한 쪽에서, commit 후 notify() 호출)"""
+    review.sentiment = None
+    review.sentiment_queued_at = time.time()
+
+
+def enqueue_existing(db: Session, missing_only=False):
+    """기존 리뷰를 대기열에 넣습니다. (다시 분석하는 동안 예전 감성 값은 그대로 보임) 반환값: 넣은 리뷰 수"""
+    stmt = update(models.Review).where(models.Review.sentiment_queued_at.is_(None))
+    if missing_only:
+        stmt = stmt.where(models.Review.sentiment.is_(None))
+    count = db.execute(stmt.values(sentiment_queued_at=time.time())).rowcount
+    db.commit()
+    return count
+
+
+def queue_stats(db: Session):
+    pending, oldest = db.execute(
+        select(func.count(models.Review.id), func.min(models.Review.sentiment_queued_at))
+        .where(models.Review.sentiment_queued_at.isnot(None))
+    ).one()
+    return {"pending": pending, "oldest_pending_seconds": time.time() - oldest if oldest else 0.0}
+
+
+def claim_batch(db: Session, limit, exclude_ids=()):
+    """오래 기다린 순서로 대기 리뷰 (id, content, sentiment_queued_at) 를 limit 개 가져옵니다."""
+    stmt = (
+        select(models.Review.id, models.Review.content, models.Review.sentiment_queued_at)
+        .where(models.Review.sentiment_queued_at.isnot(None))
+    )
+    if exclude_ids:
+        stmt = stmt.where(models.Review.id.notin_(list(exclude_ids)))
+    # sentiment_queued_at 인덱스 순서로 읽음
+    stmt = stmt.order_by(models.Review.sentiment_queued_at, models.Review.id).limit(limit)
+    return db.execute(stmt).all()
+
+
+def save_labels(db: Session, rows, labels):
+    """분석 결과 저장. 대기 시각이 그대로인 (그 사이 수정되지 않은) 리뷰만 씀. 반환값: 저장한 리뷰 수"""
+    written = 0
+    for row, label in zip(rows, labels):
+        written += db.execute(
+            text("UPDATE reviews SET sentiment = :label, sentiment_queued_at = NULL "
+                 "WHERE id = :id AND sentiment_queued_at = :queued_at"),
+            {"label": label, "id": row.id, "queued_at": row.sentiment_queued_at},
+        ).rowcount
+    db.commit()
+    return written
+
+
+# ===============================
+# 워커
+# ===============================
+class SentimentWorker:
+    """대기 중인 리뷰를 배치로 감성 분석하는 백그라운드 스레드 묶음"""
+
+    def __init__(self, session_factory=database.SessionLocal, workers=SENTIMENT_WORKERS,
+                 batch_size=SENTIMENT_BATCH_SIZE, max_wait=SENTIMENT_MAX_WAIT,
+                 poll_interval=POLL_INTERVAL, analyze=analyze_batch):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.analyze = analyze
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._claimed = set()  # 다른 워커 스레드가 분석 중인 리뷰 id
+        self._threads = []
+
+        self.batches = 0
+        self.scored = 0
+        self.stale = 0  # 분석 중 리뷰가 수정/삭제돼서 버린 결과
+        self.failures = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+        self.last_lag_seconds = 0.0  # 마지막 배치에서 가장 오래 기다린 리뷰의 대기 → 저장 시간
+        self.max_lag_seconds = 0.0
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"sentiment-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        # 서버가 꺼져 있는 동안 쌓인 리뷰부터 처리
+        self.notify()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """새 리뷰가 대기열에 들어왔음을 알림 (commit 후 호출)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            if self._stop.is_set():
+                break
+            # 리뷰가 몰려 들어올 때 조금 더 모아서 한 배치로 분석
+            time.sleep(self.max_wait)
+            self._wake.clear()
+            while not self._stop.is_set() and self.process_batch():
+                pass
+
+    def process_batch(self):
+        """대기 리뷰 한 배치를 분석해서 저장합니다. 반환값: 처리할 리뷰가 있었는지"""
+        db = self.session_factory()
+        rows = []
+        try:
+            with self._lock:
+                rows = claim_batch(db, self.batch_size, self._claimed)
+                self._claimed.update(row.id for row in rows)
+            # 읽기 트랜잭션을 닫고 분석 (분석하는 동안 DB 를 잡고 있지 않음)
+            db.rollback()
+            if not rows:
+                return False
+
+            start = time.monotonic()
+            try:
+                labels = self.analyze([row.content or "" for row in rows])
+                written = save_labels(db, rows, labels)
+            except Exception as e:
+                db.rollback()
+                with self._lock:
+                    self.failures += 1
+                print(f"감성 분석 배치 실패 ({len(rows)}건, {self.poll_interval}초 뒤 다시 시도): {e}")
+                self._stop.wait(self.poll_interval)
+                return False
+
+            lag = time.time() - min(row.sentiment_queued_at for row in rows)
+            with self._lock:
+                self.batches += 1
+                self.scored += written
+                self.stale += len(rows) - written
+                self.last_batch_size = len(rows)
+                self.last_batch_seconds = time.monotonic() - start
+                self.last_lag_seconds = lag
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            return True
+        finally:
+            with self._lock:
+                self._claimed.difference_update(row.id for row in rows)
+            db.close()
+
+    def metrics(self, db: Session):
+        """대기열 깊이 / 지연 시간 + 이 프로세스 워커의 처리량"""
+        stats = queue_stats(db)
+        with self._lock:
+            stats.update({
+                "workers": len(self._threads),
+                "in_flight": len(self._claimed),
+                "batches": self.batches,
+                "scored": self.scored,
+                "stale": self.stale,
+                "failures": self.failures,
+                "last_batch_size": self.last_batch_size,
+                "last_batch_seconds": self.last_batch_seconds,
+                "last_lag_seconds": self.last_lag_seconds,
+                "max_lag_seconds": self.max_lag_seconds,
+            })
+        return stats
+
+
+# 서버 프로세스에서 같이 쓰는 워커 (main.py lifespan 에서 start / stop)
+worker = SentimentWorker()
+
+
+def notify():
+    worker.notify()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 감성 분석 대기열 관리")
+    parser.add_argument("command", choices=["status", "rescore", "run"])
+    parser.add_argument("--missing", action="store_true", help="rescore: 감성 값이 없는 리뷰만")
+    args = parser.parse_args()
+
+    import migrations
+    migrations.upgrade(database.engine)
+
+    db = database.SessionLocal()
+    try:
+        if args.command == "status":
+            stats = queue_stats(db)
+            print(f"⏳ 대기 리뷰 {stats['pending']}건, 가장 오래 기다린 시간 {stats['oldest_pending_seconds']:.1f}초")
+            return
+        if args.command == "rescore":
+            print(f"📥 {enqueue_existing(db, missing_only=args.missing)}건 대기열에 추가")
+    finally:
+        db.close()
+
+    if args.command == "run":
+        worker.workers = max(worker.workers, 1)
+        worker.start()
+        print("🧠 감성 분석 워커 실행 중 (Ctrl+C 로 종료)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            worker.stop()
+        return
+
+    # rescore: 대기열이 빌 때까지 이 프로세스에서 바로 분석
+    start = time.monotonic()
+    while worker.process_batch():
+        print(f"   {worker.scored}건 완료 ({time.monotonic() - start:.1f}s)")
+    print(f"✅ 다시 분석 {worker.scored}건 (수정/삭제로 버린 결과 {worker.stale}건, 실패 배치 {worker.failures}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,20 +10,32 @@ st.set_page_config(page_title='영화 리뷰 홈', layout="wide", page_icon="
 BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
 hostname = socket.gethostname()
 
+# 목록 정렬 기준 (백엔드 /movies 의 sort 값 → 표시 이름)
+SORT_OPTIONS = {"id": "등록순", "rating": "평점순", "release_date": "최신 개봉순", "title": "제목순"}
+
 # --- Functions ---
-def get_movies_all():
+def get_facets():
+    # 필터 옵션(장르/개봉년도별 영화 수)만 받아옴 - 전체 영화 목록은 받지 않음
     try:
-        res = requests.get(f"{BACKEND_URL}/movies_all", timeout=5)
-        return res.json() if res.status_code == 200 else []
+        res = requests.get(f"{BACKEND_URL}/facets", timeout=5)
+        return res.json() if res.status_code == 200 else {}
     except:
-        return []
+        return {}
 
-def get_movies():
+def get_movies(params=None):
+    # 응답: {"movies": [...], "next_cursor": "...", "has_more": true/false}
     try:
-        res = requests.get(f"{BACKEND_URL}/movies", timeout=5)
-        return res.json() if res.status_code == 200 else []
+        res = requests.get(f"{BACKEND_URL}/movies", params=params, timeout=5)
+        return res.json() if res.status_code == 200 else {}
     except:
-        return []
+        return {}
+
+def get_reviews(movie_id, cursor=None, limit=10):
+    try:
+        res = requests.get(f"{BACKEND_URL}/movies/{movie_id}/reviews", params={"cursor": cursor, "limit": limit}, timeout=5)
+        return res.json() if res.status_code == 200 else {}
+    except:
+        return {}
 
 def get_movie_detail(movie_id):
     try:
@@ -70,8 +82,13 @@ def show_movie_detail(movie_id):
     st.divider()
     
     # 리뷰 섹션 (최대한 세로 길이를 압축)
-    reviews = movie.get('reviews', [])
-    st.markdown(f"#### 💬 리뷰 ({len(reviews)})")
+    # 리뷰는 최신순으로 10개씩 불러오고, "더 보기" 를 누르면 다음 커서로 이어서 불러옴
+    # 커서만 기억하고 화면을 그릴 때마다 다시 받아옴 (백그라운드 감성 분석 결과 / 다른 사람의 수정이 바로 보이도록)
+    review_key = f"review_cursors_{movie_id}"
+    review_cursors = st.session_state.setdefault(review_key, [None])
+    review_pages = [get_reviews(movie_id, cursor=cursor) for cursor in review_cursors]
+    reviews = [r for p in review_pages for r in p.get('reviews', [])]
+    st.markdown(f"#### 💬 리뷰 ({movie.get('review_count', len(reviews))})")
     
     with st.expander("➕ 새 리뷰 작성"):
         with st.form("review_form", clear_on_submit=True):
@@ -84,11 +101,12 @@ def show_movie_detail(movie_id):
                                      json={"author": author, "content": content, "rating": rating, "created_at": ""})
                     if res.status_code == 200:
                         st.success("리뷰 등록 완료!")
+                        st.session_state.pop(review_key, None)  # 첫 페이지만 다시 (새 리뷰가 맨 앞)
                         st.rerun()
                 else: st.warning("내용을 입력하세요")
 
-    # 리뷰 리스트 (카드 스타일로 압축)
-    for r in reversed(reviews):
+    # 리뷰 리스트 (카드 스타일로 압축, 백엔드에서 최신순으로 옴)
+    for r in reviews:
         sentiment_color = "blue" if r['sentiment'] == "긍정" else "red" if r['sentiment'] == "부정" else "gray"
         with st.container(border=True):
             c1, c2 = st.columns([4, 1])
@@ -97,7 +115,18 @@ def show_movie_detail(movie_id):
                 st.markdown(f"{r['content']}")
             with c2:
                 st.markdown(f"⭐ {r['rating']}")
-                st.markdown(f"<span style='color:{sentiment_color}; font-weight:bold;'>{r['sentiment']}</span>", unsafe_allow_html=True)
+                # 감성 분석은 백엔드 워커가 나중에 채움 (그 전까지 None)
+                sentiment_label = r['sentiment'] or "⏳ 분석 중"
+                st.markdown(f"<span style='color:{sentiment_color}; font-weight:bold;'>{sentiment_label}</span>", unsafe_allow_html=True)
+
+    if any(r['sentiment'] is None for r in reviews):
+        if st.button("🔄 감성 분석 결과 새로고침", use_container_width=True):
+            st.rerun()
+
+    if review_pages[-1].get('has_more'):
+        if st.button("리뷰 더 보기", use_container_width=True):
+            review_cursors.append(review_pages[-1]['next_cursor'])
+            st.rerun()
 
 def show_home():
     # --- 상세 보기 모드 ---
@@ -110,49 +139,46 @@ def show_home():
         # --- [목록 페이지] ---
         st.header("🍿 영화 감상실")
         
-        # 1. 사이드바나 상단에서 모든 영화 정보 미리 가져오기 (필터 옵션용)
-        raw_movies = get_movies_all() # raw_movies: 영화 데이터 리스트
-        # st.write(f"총 영화: {len(raw_movies)}")
-        genres = set()  # 중복 제거를 위해 set 사용
-
-        for m in raw_movies:
-            if m.get('genre'):
-                # 콤마로 분리 후 strip()으로 공백 제거
-                for g in m['genre'].split(','):
-                    genres.add(g.strip())
+        # 1. 필터 옵션(장르 / 개봉년도 + 영화 수)은 백엔드에서 SQL 로 집계한 결과만 가져오기
+        facets = get_facets()
+        genre_counts = {g['name']: g['count'] for g in facets.get('genres', [])}
+        year_counts = {str(y['year']): y['count'] for y in facets.get('years', [])}
 
         # 최종적으로 정렬된 리스트
-        genres = sorted(genres)
-
-        years = sorted(list(set(m['release_date'][:4] for m in raw_movies if m.get('release_date'))), reverse=True)
+        genres = sorted(genre_counts)
+        years = list(year_counts)  # 백엔드에서 최신 연도순으로 정렬됨
 
         # 2. 검색 UI
         with st.expander("🔍 상세 검색 및 필터", expanded=True):
             c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
             s_title = c1.text_input("영화 제목")
-            s_genre = c2.selectbox("장르", ["전체"] + genres)
+            s_genre = c2.selectbox("장르", ["전체"] + genres,
+                                   format_func=lambda g: f"{g} ({genre_counts[g]})" if g in genre_counts else g)
             s_director = c3.text_input("감독명")
-            s_year = c4.selectbox("개봉년도", ["전체"] + years)
+            s_year = c4.selectbox("개봉년도", ["전체"] + years,
+                                  format_func=lambda y: f"{y} ({year_counts[y]})" if y in year_counts else y)
+            s_sort = st.radio("정렬", list(SORT_OPTIONS), format_func=SORT_OPTIONS.get, horizontal=True)
 
         # 3. 페이징 상태 및 필터 변경 감지
-        if 'page' not in st.session_state: st.session_state.page = 1
+        # cursors: 지금까지 지나온 페이지의 커서 목록 (마지막이 현재 페이지, 이전 페이지는 pop)
+        if 'cursors' not in st.session_state: st.session_state.cursors = [None]
         
-        # 필터 변경 시 페이지 리셋
-        filter_state = f"{s_title}_{s_genre}_{s_director}_{s_year}"
+        # 필터/정렬 변경 시 페이지 리셋
+        filter_state = f"{s_title}_{s_genre}_{s_director}_{s_year}_{s_sort}"
         if 'last_filter' not in st.session_state:
             st.session_state.last_filter = filter_state
         
         if st.session_state.last_filter != filter_state:
-            st.session_state.page = 1
+            st.session_state.cursors = [None]
             st.session_state.last_filter = filter_state
 
         limit = 10
-        skip = (st.session_state.page - 1) * limit
 
-        # 4. API로 필터링된 데이터만 가져오기
-        params = {"skip": skip, "limit": limit, "title": s_title, "genre": s_genre, "director": s_director, "year": s_year}
-        res = requests.get(f"{BACKEND_URL}/movies", params=params)
-        current_movies = res.json() if res.status_code == 200 else []
+        # 4. API로 필터링된 데이터만 가져오기 (offset 대신 커서)
+        params = {"cursor": st.session_state.cursors[-1], "limit": limit, "sort": s_sort,
+                  "title": s_title, "genre": s_genre, "director": s_director, "year": s_year}
+        page = get_movies(params)
+        current_movies = page.get("movies", [])
         if not current_movies:
             st.info("조건에 맞는 영화가 없습니다.")
         else:
@@ -178,15 +204,15 @@ def show_home():
             st.divider()
             col_b1, col_page, col_b2 = st.columns([1, 2, 1])
             with col_b1:
-                if st.button("⬅️ 이전 페이지", disabled=st.session_state.page <= 1, use_container_width=True):
-                    st.session_state.page -= 1
+                if st.button("⬅️ 이전 페이지", disabled=len(st.session_state.cursors) <= 1, use_container_width=True):
+                    st.session_state.cursors.pop()
                     st.rerun()
             with col_page:
-                st.markdown(f"<center><b>{st.session_state.page} 페이지</b></center>", unsafe_allow_html=True)
+                st.markdown(f"<center><b>{len(st.session_state.cursors)} 페이지</b></center>", unsafe_allow_html=True)
             with col_b2:
-                # 다음 페이지 데이터가 있는지 확인용 (간단히 현재 데이터가 limit만큼 있으면 다음이 있다고 가정)
-                if st.button("다음 페이지 ➡️", disabled=len(current_movies) < limit, use_container_width=True):
-                    st.session_state.page += 1
+                # 다음 페이지가 있는지는 백엔드가 알려줌 (has_more)
+                if st.button("다음 페이지 ➡️", disabled=not page.get("has_more"), use_container_width=True):
+                    st.session_state.cursors.append(page["next_cursor"])
                     st.rerun()
 
 # 실행
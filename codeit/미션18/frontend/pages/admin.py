@@ -8,11 +8,21 @@ st.set_page_config(page_title='영화 관리자', layout="wide", page_icon="⚙
 BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
 
 def get_movies():
+    # /movies 는 커서 페이지네이션이므로 next_cursor 를 따라가며 전체를 모음
+    movies, cursor = [], None
     try:
-        res = requests.get(f"{BACKEND_URL}/movies", timeout=5)
-        return res.json() if res.status_code == 200 else []
+        while True:
+            res = requests.get(f"{BACKEND_URL}/movies", params={"cursor": cursor, "limit": 100}, timeout=5)
+            if res.status_code != 200:
+                break
+            page = res.json()
+            movies.extend(page["movies"])
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
     except:
-        return []
+        pass
+    return movies
 
 st.title("⚙️ 영화 데이터 관리자")
 
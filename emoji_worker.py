@@ -0,0 +1,109 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from transformers import pipeline
+
+EMOJI_MODEL = "google/flan-t5-small"
+
+
+def build_prompt(label_text):
+    # 이모지 대신 "animal" 같은 단어를 뱉으라고 시키는 게 T5에게는 훨씬 쉽습니다.
+    return (
+        "Classify the following items into one simple category word (e.g., animal, vehicle, food, tool, nature, building, person, or object).\n"
+        f"Items: {label_text}\n"
+        "Category:"
+    )
+
+
+def load_emoji_pipeline():
+    return pipeline("text2text-generation", model=EMOJI_MODEL)
+
+
+class EmojiCategoryWorker:
+    """키워드로 못 찾은 라벨 묶음을 백그라운드에서 flan-t5 로 카테고리 분류하는 워커
+
+    - 요청 경로에서는 모델을 로드하거나 실행하지 않고 Future 만 돌려줍니다.
+    - 대기 중인 요청은 max_wait 초 동안 모아서 batch_size 개씩 한 번에 생성합니다.
+    - 결과는 SQLite 표(라벨 → 카테고리)에 저장해서 같은 라벨 묶음은 LLM 을 다시 부르지 않습니다.
+    """
+
+    def __init__(self, db_path, batch_size=16, max_wait=0.05, loader=load_emoji_pipeline):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.loader = loader
+        self._pipe = None
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS categories (labels TEXT PRIMARY KEY, category TEXT)")
+        self._conn.commit()
+        self._known = dict(self._conn.execute("SELECT labels, category FROM categories"))
+
+        self._pending = {}  # 라벨 문자열 -> Future
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="emoji-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, labels):
+        """라벨 묶음의 카테고리 Future 를 반환합니다. 이미 아는 라벨이면 완료된 Future 입니다."""
+        key = ", ".join(labels).lower()
+        with self._lock:
+            if key in self._known:
+                future = Future()
+                future.set_result(self._known[key])
+                return future
+            if key in self._pending:
+                return self._pending[key]
+
+            future = Future()
+            self._pending[key] = future
+            self._queue.put(key)
+            return future
+
+    def _run(self):
+        while True:
+            keys = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(keys) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    keys.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(keys)
+
+    def _process(self, keys):
+        try:
+            if self._pipe is None:
+                self._pipe = self.loader()
+            prompts = [build_prompt(key) for key in keys]
+            outputs = self._pipe(prompts, max_new_tokens=5, batch_size=len(prompts))
+        except Exception as e:
+            with self._lock:
+                for key in keys:
+                    self._pending.pop(key).set_exception(e)
+            return
+
+        categories = []
+        for out in outputs:
+            out = out[0] if isinstance(out, list) else out
+            categories.append(out["generated_text"].lower().strip())
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO categories (labels, category) VALUES (?, ?)",
+                list(zip(keys, categories)),
+            )
+            self._conn.commit()
+            for key, category in zip(keys, categories):
+                self._known[key] = category
+                self._pending.pop(key).set_result(category)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+
+# PIL convert('L') 과 같은 휘도 가중치
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# 학습 때 쓴 transforms.Normalize((0.1307,), (0.3081,)) (미션16 modeling.ipynb)
+# 내보낸 mnist_cnn.onnx 그래프는 Conv/MaxPool/Relu/Reshape/Gemm 뿐이라 정규화가 들어 있지 않으므로 입력에 직접 적용
+MNIST_MEAN = 0.1307
+MNIST_STD = 0.3081
+
+
+def normalize(digits, out=None):
+    """0~1 픽셀 값 → 학습 때와 같은 정규화 값"""
+    out = np.subtract(digits, MNIST_MEAN, out=out, dtype=np.float32)
+    return np.divide(out, MNIST_STD, out=out)
+
+
+def softmax(logits):
+    """최댓값을 빼서 overflow 없이 계산하는 softmax"""
+    exps = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exps / exps.sum(axis=-1, keepdims=True)
+
+
+class MnistOnnxClassifier:
+    """MNIST ONNX 모델을 재사용하는 추론 래퍼
+
+    - 입력/출력 이름을 한 번만 조회해서 저장
+    - 그래프 최적화/스레드 수가 설정된 세션은 ModelStore.create_session 으로 만들어서 전달
+    - (1, 1, 28, 28) 입력 버퍼를 미리 만들어 두고 매번 재사용
+    """
+
+    def __init__(self, session, size=28):
+        self.size = size
+        self.session = session
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = [self.session.get_outputs()[0].name]
+
+        self._input = np.zeros((1, 1, size, size), dtype=np.float32)
+        self._lock = threading.Lock()  # 여러 사용자가 같은 버퍼를 동시에 쓰지 않도록
+
+    def preprocess(self, rgba, out=None):
+        """캔버스 RGBA 배열 → 흑백 → size x size 평균 축소 → 0~1 정규화를 한 번의 NumPy 연산으로 처리합니다."""
+        height, width = rgba.shape[:2]
+        fy, fx = height // self.size, width // self.size
+        # 크기가 size 의 배수가 아니면 남는 가장자리는 잘라냄
+        blocks = rgba[:fy * self.size, :fx * self.size, :3].reshape(self.size, fy, self.size, fx, 3)
+        gray = blocks.mean(axis=(1, 3), dtype=np.float32) @ (GRAY_WEIGHTS / 255.0)
+        if out is None:
+            return gray
+        out[...] = gray
+        return out
+
+    def predict(self, rgba):
+        """캔버스 이미지로 숫자별 확률(10개)과 전처리된 28x28 이미지(0~1)를 반환합니다."""
+        with self._lock:
+            digit = self.preprocess(rgba, out=self._input[0, 0])
+            display = digit.copy()
+            normalize(digit, out=digit)
+            logits = self.session.run(self.output_names, {self.input_name: self._input})[0][0]
+            return softmax(logits), display
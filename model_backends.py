@@ -0,0 +1,203 @@
+"""
+이미지 분류 추론 백엔드
+
+- torch-fp32         : 기본 transformers 파이프라인 (fp32 PyTorch)
+- torch-int8-dynamic : Linear 레이어를 int8 동적 양자화한 PyTorch 모델
+- onnxruntime        : ONNX 로 내보낸 모델을 onnxruntime(CPU)으로 실행
+
+int8 / onnx 는 처음 사용할 때 변환 결과물을 MODEL_ARTIFACT_DIR 에 저장해 두고 재사용합니다.
+모든 백엔드는 파이프라인과 같은 [{"label": ..., "score": ...}, ...] 형식을 반환합니다.
+
+📌 정확도 확인:
+python model_backends.py --model google/vit-base-patch16-224 --backend onnxruntime --images ./samples
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import AutoConfig, AutoImageProcessor, AutoModelForImageClassification, pipeline
+
+BACKENDS = ("torch-fp32", "torch-int8-dynamic", "onnxruntime")
+DEFAULT_BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch-fp32")
+ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".model_artifacts"))
+
+
+def _artifact_path(model_name, filename):
+    folder = os.path.join(ARTIFACT_DIR, model_name.replace("/", "__"))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+def _atomic_save(path, save_fn):
+    """임시 파일에 저장한 뒤 rename 해서, 저장 도중 다른 프로세스가 반쪽 파일을 읽지 않게 합니다."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _quantize_int8(model_name):
+    """fp32 모델을 불러와 Linear 레이어를 int8 로 동적 양자화합니다."""
+    fp32_model = AutoModelForImageClassification.from_pretrained(model_name).eval()
+    return torch.quantization.quantize_dynamic(fp32_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_int8_classifier(model_name):
+    # 모델 전체를 pickle 하면 torch / transformers 버전이 바뀔 때 깨지고 임의 코드도 unpickle 되므로
+    # state_dict 만 저장하고, 불러올 때는 같은 구조를 양자화로 다시 만든 뒤 weights_only 로 값만 채움
+    path = _artifact_path(model_name, "int8_dynamic.pt")
+    processor = AutoImageProcessor.from_pretrained(model_name)
+    model = _quantize_int8(model_name)
+
+    if os.path.exists(path):
+        try:
+            model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+        except Exception as e:
+            # 예전 형식(모델 전체 pickle)이거나 버전이 달라 맞지 않으면 새로 양자화해서 덮어씀
+            print(f"⚠️ int8 캐시를 불러오지 못해 다시 양자화합니다 ({path}): {type(e).__name__}: {e}")
+            model = _quantize_int8(model_name)
+            _atomic_save(path, lambda p: torch.save(model.state_dict(), p))
+    else:
+        _atomic_save(path, lambda p: torch.save(model.state_dict(), p))
+
+    pipe = pipeline("image-classification", model=model, image_processor=processor)
+    pipe.artifact_path = path
+    return pipe
+
+
+def _export_onnx(model_name, processor, path):
+    model = AutoModelForImageClassification.from_pretrained(model_name).eval()
+    model.config.return_dict = False
+    dummy = processor(Image.new("RGB", (224, 224)), return_tensors="pt")["pixel_values"]
+
+    def _save(tmp_path):
+        with torch.no_grad():
+            torch.onnx.export(
+                model, (dummy,), tmp_path,
+                input_names=["pixel_values"], output_names=["logits"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+                opset_version=17,
+            )
+
+    _atomic_save(path, _save)
+    return model.config.id2label
+
+
+class OnnxImageClassifier:
+    """ONNX 모델을 image-classification 파이프라인처럼 호출할 수 있게 감싼 클래스"""
+
+    backend = "onnxruntime"
+
+    def __init__(self, model_name, onnx_path, processor, id2label):
+        import onnxruntime as ort
+
+        self.model_name = model_name
+        self.artifact_path = onnx_path
+        self.processor = processor
+        self.id2label = {int(k): v for k, v in id2label.items()}
+        self.session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+
+    def __call__(self, images, top_k=5, batch_size=None):
+        single = not isinstance(images, list)
+        images = [images] if single else images
+        step = batch_size or len(images)
+
+        outputs = []
+        for start in range(0, len(images), step):
+            chunk = [image.convert("RGB") for image in images[start:start + step]]
+            pixel_values = self.processor(chunk, return_tensors="np")["pixel_values"].astype(np.float32)
+            logits = self.session.run(None, {"pixel_values": pixel_values})[0]
+            outputs.extend(self._postprocess(logits, top_k))
+        return outputs[0] if single else outputs
+
+    def _postprocess(self, logits, top_k):
+        top_k = min(top_k, logits.shape[-1])
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=-1, keepdims=True)
+
+        results = []
+        for row in probs:
+            top = np.argsort(row)[::-1][:top_k]
+            results.append([{"label": self.id2label[int(i)], "score": float(row[i])} for i in top])
+        return results
+
+
+def _load_onnx_classifier(model_name):
+    path = _artifact_path(model_name, "model.onnx")
+    processor = AutoImageProcessor.from_pretrained(model_name)
+
+    if os.path.exists(path):
+        id2label = AutoConfig.from_pretrained(model_name).id2label
+    else:
+        id2label = _export_onnx(model_name, processor, path)
+
+    return OnnxImageClassifier(model_name, path, processor, id2label)
+
+
+def load_classifier(model_name, backend=DEFAULT_BACKEND):
+    """백엔드에 맞는 이미지 분류기를 로드합니다."""
+    if backend == "torch-fp32":
+        pipe = pipeline("image-classification", model=model_name)
+    elif backend == "torch-int8-dynamic":
+        pipe = _load_int8_classifier(model_name)
+    elif backend == "onnxruntime":
+        return _load_onnx_classifier(model_name)
+    else:
+        raise ValueError(f"지원하지 않는 백엔드입니다: {backend} (가능: {', '.join(BACKENDS)})")
+
+    pipe.backend = backend
+    return pipe
+
+
+def check_backend_drift(model_name, backend, images, reference=None):
+    """fp32 파이프라인과 비교해 Top-1 일치율을 계산합니다.
+
+    반환값: {"agreement": 일치율, "count": 이미지 수, "mismatches": [(인덱스, fp32 라벨, 백엔드 라벨), ...]}
+    """
+    reference = reference or load_classifier(model_name, "torch-fp32")
+    candidate = load_classifier(model_name, backend)
+
+    mismatches = []
+    for idx, image in enumerate(images):
+        expected = reference(image, top_k=1)[0]["label"]
+        actual = candidate(image, top_k=1)[0]["label"]
+        if expected != actual:
+            mismatches.append((idx, expected, actual))
+
+    count = len(images)
+    return {
+        "agreement": (count - len(mismatches)) / count if count else 1.0,
+        "count": count,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="백엔드별 Top-1 일치율(fp32 대비) 확인")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--backend", choices=BACKENDS[1:], required=True)
+    parser.add_argument("--images", required=True, help="샘플 이미지 폴더")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.images, name) for name in os.listdir(args.images)
+        if name.lower().endswith((".jpg", ".jpeg", ".png"))
+    )
+    images = [Image.open(path).convert("RGB") for path in paths]
+    report = check_backend_drift(args.model, args.backend, images)
+
+    print(f"✅ Top-1 일치율: {report['agreement'] * 100:.1f}% ({report['count']}장)")
+    for idx, expected, actual in report["mismatches"]:
+        print(f" - {os.path.basename(paths[idx])}: fp32={expected} / {args.backend}={actual}")
+
+
+if __name__ == "__main__":
+    main()
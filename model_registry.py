@@ -0,0 +1,147 @@
+import gc
+import os
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+
+def estimate_pipeline_bytes(pipe):
+    """파이프라인 모델의 파라미터 + 버퍼 메모리 사용량(바이트)을 추정합니다."""
+    # 양자화/ONNX 모델은 파라미터로 크기를 잴 수 없어서 변환 파일 크기로 추정
+    artifact_path = getattr(pipe, "artifact_path", None)
+    if artifact_path:
+        return os.path.getsize(artifact_path)
+
+    model = getattr(pipe, "model", pipe)
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """메모리 예산을 넘으면 가장 오래 안 쓴 모델부터 내리는 모델 저장소
+
+    st.cache_resource 는 한 번 올린 모델을 계속 들고 있어서,
+    여러 모델을 비교하다 보면 메모리가 끝없이 늘어납니다.
+    """
+
+    def __init__(self, budget_bytes, estimate=estimate_pipeline_bytes):
+        self.budget_bytes = budget_bytes
+        self.estimate = estimate
+        self._models = OrderedDict()  # key -> (pipeline, 바이트)
+        self._sizes = {}  # key -> 마지막으로 잰 바이트 (내린 뒤에도 기억해서 lease 에서 사용)
+        self._loading = {}  # key -> 로드 완료 Event (같은 모델을 두 번 로드하지 않도록)
+        self._pins = Counter()  # key -> lease 중인 작업 수 (사용 중에는 내리지 않음)
+        self._leased_bytes = 0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self.loads = 0
+        self.evictions = 0
+        self.hits = 0
+
+    def get(self, key, loader):
+        """key 에 해당하는 모델을 반환합니다. 없으면 loader() 로 로드합니다."""
+        return self._get(key, loader, pin=False)
+
+    def _get(self, key, loader, pin):
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    if pin:
+                        self._pins[key] += 1
+                    return self._models[key][0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # 다른 스레드가 같은 모델을 로드 중이면 끝나길 기다렸다가 다시 확인 (실패했으면 직접 로드)
+            loading.wait()
+
+        # 로드는 락 밖에서 (느린 로드 중에도 다른 모델 캐시 조회는 바로 응답)
+        try:
+            pipe = loader()
+            size = self.estimate(pipe)
+        except BaseException:
+            with self._lock:
+                self._loading.pop(key).set()
+            raise
+
+        with self._lock:
+            self._models[key] = (pipe, size)
+            self._sizes[key] = size
+            self.loads += 1
+            if pin:
+                self._pins[key] += 1
+            self._evict()
+            self._loading.pop(key).set()
+        return pipe
+
+    @contextmanager
+    def lease(self, key, loader):
+        """모델을 빌려 쓰는 동안 내리지 않도록 고정합니다.
+
+        동시에 빌린 모델의 크기 합이 예산을 넘으면 앞의 작업이 반납할 때까지 기다립니다.
+        (처음 로드하는 모델은 크기를 모르므로 예산 전체를 차지한다고 보고 혼자 실행)
+        """
+        need = min(self._sizes.get(key, self.budget_bytes), self.budget_bytes)
+        with self._released:
+            while self._leased_bytes and self._leased_bytes + need > self.budget_bytes:
+                self._released.wait()
+            self._leased_bytes += need
+        try:
+            pipe = self._get(key, loader, pin=True)
+        except BaseException:
+            self._release(key, need, pinned=False)
+            raise
+        try:
+            yield pipe
+        finally:
+            self._release(key, need, pinned=True)
+
+    def _release(self, key, need, pinned):
+        with self._released:
+            self._leased_bytes -= need
+            if pinned:
+                self._pins[key] -= 1
+                if self._pins[key] <= 0:
+                    del self._pins[key]
+                # 사용 중이라 못 내린 모델이 있었으면 지금 정리
+                self._evict()
+            self._released.notify_all()
+
+    def _evict(self):
+        # 방금 로드한 모델(맨 뒤)과 사용 중(lease)인 모델은 예산을 넘어도 남겨 둠
+        evicted = False
+        for key in list(self._models)[:-1]:
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            if self._pins[key]:
+                continue
+            del self._models[key]
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def evict(self, key):
+        with self._lock:
+            if not self._pins[key] and self._models.pop(key, None) is not None:
+                self.evictions += 1
+                gc.collect()
+
+    def resident_bytes(self):
+        return sum(size for _, size in self._models.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "hits": self.hits,
+                "resident_models": list(self._models.keys()),
+                "resident_bytes": self.resident_bytes(),
+                "budget_bytes": self.budget_bytes,
+            }
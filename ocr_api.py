@@ -0,0 +1,136 @@
+"""
+📑 OCR 배치 작업 API
+1. POST /jobs 로 이미지 여러 장을 올리면 SQLite 큐에 작업으로 저장하고 batch_id 를 돌려줌
+2. 워커 프로세스(OCR_JOB_WORKERS 개)가 각자 easyocr Reader 를 1회만 로드해서 큐의 작업을 처리
+3. 결과는 GET /jobs/{job_id}, GET /batches/{batch_id} 로 조회(polling)하거나
+   GET /batches/{batch_id}/results 로 끝나는 대로 JSONL 스트림으로 받음
+4. 워커가 죽으면 잡고 있던 작업을 다시 대기열에 넣고 새 워커를 띄움
+
+📌 실행 방법:
+uvicorn ocr_api:app --port 8017
+
+📌 요청 예시:
+curl -X POST localhost:8017/jobs -F "files=@scan1.png" -F "files=@scan2.jpg"
+curl localhost:8017/batches/<batch_id>
+curl -N localhost:8017/batches/<batch_id>/results
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ocr_jobs import OCR_JOBS_DB, JobQueue, WorkerPool
+
+OCR_JOB_WORKERS = int(os.getenv("OCR_JOB_WORKERS", os.cpu_count() or 1))
+SUPERVISE_INTERVAL = 1.0
+STREAM_POLL_INTERVAL = 0.5
+
+
+# ===============================
+# 전역 저장소 + Lifespan
+# ===============================
+ocr = {}
+
+
+async def supervise(pool):
+    """죽은 워커를 주기적으로 확인해서 작업을 되돌리고 새로 띄움"""
+    while True:
+        await asyncio.sleep(SUPERVISE_INTERVAL)
+        await run_in_threadpool(pool.check)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"====== OCR 워커 {OCR_JOB_WORKERS}개 시작중...")
+    pool = WorkerPool(OCR_JOB_WORKERS, db_path=OCR_JOBS_DB)
+    pool.start()
+    ocr["pool"] = pool
+    ocr["queue"] = JobQueue(OCR_JOBS_DB)
+    supervisor = asyncio.create_task(supervise(pool))
+    print("✅ OCR 워커 시작 완료")
+
+    yield
+
+    print("🧹 OCR 워커 정리")
+    supervisor.cancel()
+    pool.stop()
+    ocr["queue"].close()
+    ocr.clear()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/")
+def read_root():
+    pool = ocr["pool"]
+    return {
+        "status": "ok",
+        "workers": pool.workers,
+        "workers_alive": pool.alive(),
+        "worker_restarts": pool.restarts,
+        "jobs": ocr["queue"].counts(),
+    }
+
+
+@app.post("/jobs")
+async def submit_jobs(files: List[UploadFile] = File(...)):
+    payload = []
+    for file in files:
+        data = await file.read()
+        if not data:
+            raise HTTPException(status_code=400, detail=f"빈 파일입니다: {file.filename}")
+        payload.append((file.filename, data))
+
+    # SQLite 쓰기는 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    batch_id, job_ids = await run_in_threadpool(ocr["queue"].submit, payload)
+    return {
+        "batch_id": batch_id,
+        "jobs": [{"id": job_id, "filename": name} for job_id, (name, _) in zip(job_ids, payload)],
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = ocr["queue"].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+
+@app.get("/batches/{batch_id}")
+def get_batch(batch_id: str, include_results: bool = False):
+    queue = ocr["queue"]
+    counts = queue.counts(batch_id)
+    if not any(counts.values()):
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    response = {"batch_id": batch_id, "counts": counts, "finished": counts["queued"] + counts["running"] == 0}
+    if include_results:
+        response["jobs"] = queue.batch_jobs(batch_id)
+    return response
+
+
+@app.get("/batches/{batch_id}/results")
+async def stream_batch(batch_id: str):
+    """배치 작업이 끝나는 대로 한 줄에 하나씩(JSONL) 보내고, 모두 끝나면 스트림을 닫습니다."""
+    queue = ocr["queue"]
+    total = sum((await run_in_threadpool(queue.counts, batch_id)).values())
+    if total == 0:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+
+    async def _lines():
+        sent = set()
+        while len(sent) < total:
+            jobs = await run_in_threadpool(queue.batch_jobs, batch_id, finished_only=True, exclude=set(sent))
+            for job in jobs:
+                sent.add(job["id"])
+                yield json.dumps(job, ensure_ascii=False) + "\n"
+            if len(sent) < total:
+                await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
@@ -0,0 +1,273 @@
+"""
+OCR 배치 작업 큐 (SQLite) + 워커 프로세스 풀
+
+- 작업(이미지 1장 = job 1개)은 SQLite 파일에 저장되므로 서버를 재시작해도 사라지지 않습니다.
+- 워커 프로세스는 시작할 때 easyocr Reader 를 1회만 로드하고, 큐에서 작업을 하나씩 가져가 처리합니다.
+  (전처리/검출/인식은 페이지 6 과 같은 ocr_pipeline 을 사용)
+- 워커가 죽으면 그 워커가 잡고 있던 작업을 다시 대기열로 돌려놓고 워커를 새로 띄웁니다.
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_JOBS_DB = os.getenv("OCR_JOBS_DB", os.path.join(BASE_DIR, ".ocr_jobs.db"))
+OCR_JOB_MAX_ATTEMPTS = int(os.getenv("OCR_JOB_MAX_ATTEMPTS", 3))
+POLL_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    batch_id TEXT NOT NULL,
+    filename TEXT,
+    image BLOB,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued / running / done / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id);
+"""
+
+JOB_COLUMNS = "id, batch_id, filename, status, attempts, result, error, created_at, started_at, finished_at"
+
+
+def job_to_dict(row):
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+class JobQueue:
+    """SQLite 기반 OCR 작업 큐 (프로세스마다 따로 만들어서 사용, 연결은 스레드마다 따로 엶)"""
+
+    def __init__(self, db_path=OCR_JOBS_DB, max_attempts=OCR_JOB_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        # sqlite3 연결은 스레드 사이에 공유하면 안 되므로 (API 스레드풀) 스레드마다 하나씩 만들고 close() 때 모두 닫음
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns = []
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 여러 워커 프로세스가 동시에 읽고 쓰므로 WAL + busy_timeout 사용
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def submit(self, files, batch_id=None):
+        """files: [(파일 이름, 이미지 바이트)] → (batch_id, job id 목록)"""
+        batch_id = batch_id or uuid.uuid4().hex
+        now = time.time()
+        rows = [(uuid.uuid4().hex, batch_id, filename, data, now) for filename, data in files]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT INTO jobs (id, batch_id, filename, image, created_at) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return batch_id, [row[0] for row in rows]
+
+    def claim(self, worker_pid):
+        """대기 중인 작업 1개를 가져가서 running 으로 바꿉니다. 없으면 None"""
+        # BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡아서 두 워커가 같은 작업을 가져가지 않게 함
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id, filename, image FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker_pid, time.time(), row["id"]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def complete(self, job_id, result):
+        # 결과가 저장되면 원본 이미지는 더 필요 없으므로 비워서 DB 크기를 줄임
+        self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, image = NULL, finished_at = ? WHERE id = ?",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id),
+        )
+
+    def fail(self, job_id, error):
+        self.conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, image = NULL, finished_at = ? WHERE id = ?",
+            (error, time.time(), job_id),
+        )
+
+    def requeue_running(self, worker_pid=None):
+        """죽은 워커(worker_pid, None 이면 전체)가 잡고 있던 작업을 다시 대기열로 돌립니다.
+
+        이미 max_attempts 번 시도한 작업은 (워커를 계속 죽이는 이미지일 수 있으므로) failed 로 처리합니다.
+        반환값: (다시 대기열로 간 수, 실패 처리된 수)
+        """
+        where = "status = 'running'" + (" AND worker_pid = ?" if worker_pid is not None else "")
+        params = (worker_pid,) if worker_pid is not None else ()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            failed = self.conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = '워커가 비정상 종료되었습니다.', image = NULL, "
+                f"finished_at = ? WHERE {where} AND attempts >= ?",
+                (time.time(), *params, self.max_attempts),
+            ).rowcount
+            requeued = self.conn.execute(
+                f"UPDATE jobs SET status = 'queued', worker_pid = NULL, started_at = NULL WHERE {where}",
+                params,
+            ).rowcount
+        return requeued, failed
+
+    def get(self, job_id):
+        row = self.conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_to_dict(row) if row else None
+
+    def batch_jobs(self, batch_id, finished_only=False, exclude=()):
+        sql = f"SELECT {JOB_COLUMNS} FROM jobs WHERE batch_id = ?"
+        if finished_only:
+            sql += " AND status IN ('done', 'failed')"
+        rows = self.conn.execute(sql + " ORDER BY created_at, rowid", (batch_id,)).fetchall()
+        return [job_to_dict(row) for row in rows if row["id"] not in exclude]
+
+    def counts(self, batch_id=None):
+        sql = "SELECT status, COUNT(*) FROM jobs"
+        params = ()
+        if batch_id is not None:
+            sql += " WHERE batch_id = ?"
+            params = (batch_id,)
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update(dict(self.conn.execute(sql + " GROUP BY status", params).fetchall()))
+        return counts
+
+
+# ===============================
+# 워커 프로세스
+# ===============================
+def ocr_image(reader, data):
+    """이미지 바이트 → JSON 으로 저장 가능한 OCR 결과"""
+    import io
+
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    from ocr_pipeline import run_ocr
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+    # 워커 1개 = 코어 1개로 쓰므로 타일 병렬화 없이 현재 프로세스에서 처리
+    results, _, _, timings = run_ocr(np.array(image), reader=reader)
+    return {
+        "lines": [
+            {"bbox": [[float(x), float(y)] for x, y in bbox], "text": text, "confidence": float(prob)}
+            for bbox, text, prob in results
+        ],
+        "timings": timings,
+    }
+
+
+def worker_main(db_path, langs, torch_threads, stop_event):
+    """(워커 프로세스) Reader 를 1회 로드한 뒤 큐가 빌 때까지 작업을 처리합니다."""
+    import easyocr
+    import torch
+
+    # 워커 수만큼 프로세스가 돌기 때문에 torch 스레드는 나눠서 사용 (과다 구독 방지)
+    torch.set_num_threads(torch_threads)
+    reader = easyocr.Reader(langs, gpu=False, verbose=False)
+    queue = JobQueue(db_path)
+    pid = os.getpid()
+
+    while not stop_event.is_set():
+        job = queue.claim(pid)
+        if job is None:
+            stop_event.wait(POLL_INTERVAL)
+            continue
+        try:
+            queue.complete(job["id"], ocr_image(reader, job["image"]))
+        except Exception as e:
+            queue.fail(job["id"], f"{type(e).__name__}: {e}")
+    queue.close()
+
+
+class WorkerPool:
+    """OCR 워커 프로세스들을 띄우고, 죽은 워커의 작업을 다시 대기열로 돌린 뒤 새 워커로 교체합니다."""
+
+    def __init__(self, workers, db_path=OCR_JOBS_DB, langs=None, torch_threads=None):
+        from ocr_pipeline import OCR_LANGS
+
+        self.workers = workers
+        self.db_path = db_path
+        self.langs = langs or OCR_LANGS
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+        # torch 가 fork 와 충돌하지 않도록 spawn 사용
+        self.ctx = multiprocessing.get_context("spawn")
+        self.stop_event = self.ctx.Event()
+        self.processes = []
+        self.restarts = 0
+        self.queue = JobQueue(db_path)
+
+    def _spawn(self):
+        process = self.ctx.Process(
+            target=worker_main,
+            args=(self.db_path, self.langs, self.torch_threads, self.stop_event),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        # 이전 서버가 비정상 종료됐다면 running 으로 남은 작업이 있으므로 먼저 되돌림
+        self.queue.requeue_running()
+        self.processes = [self._spawn() for _ in range(self.workers)]
+
+    def check(self):
+        """죽은 워커를 찾아 작업을 되돌리고 새로 띄웁니다. 반환값: 교체한 워커 수"""
+        replaced = 0
+        for i, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            requeued, failed = self.queue.requeue_running(process.pid)
+            print(f"⚠️ OCR 워커 {process.pid} 종료 (exit={process.exitcode}) → 재시도 {requeued}건, 실패 {failed}건")
+            self.processes[i] = self._spawn()
+            replaced += 1
+        self.restarts += replaced
+        return replaced
+
+    def stop(self, timeout=10):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        # 처리 도중 종료된 작업은 다음 시작 때 다시 처리
+        self.queue.requeue_running()
+        self.queue.close()
+
+    def alive(self):
+        return sum(process.is_alive() for process in self.processes)
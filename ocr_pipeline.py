@@ -0,0 +1,278 @@
+"""
+타일 분할 병렬 OCR 파이프라인
+
+큰 이미지(영수증, 여러 장 스캔본)를 겹치는 타일로 나눠서
+전처리(노이즈 제거 + 이진화)와 easyocr 검출/인식을 프로세스 풀에서 병렬로 실행하고,
+타일 경계에서 중복 인식된 박스를 합쳐 하나의 결과로 만듭니다.
+
+- 전처리 결과(gray / denoised / thresh)는 이미지 해시별로 BufferCache 에 보관해서 재실행 시 건너뜁니다.
+- 글자 위치 검출(detect)은 1회만 하고, 줄 단위 인식과 문단(paragraph=True) 인식이 같은 검출 결과를 공유합니다.
+"""
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+OCR_LANGS = ["ko", "en"]
+TILE_SIZE = 1024
+TILE_OVERLAP = 128
+BUFFER_NAMES = ("gray", "denoised", "thresh")
+
+_reader = None  # 워커 프로세스마다 1회만 로드되는 easyocr Reader
+
+
+def image_key(data):
+    """업로드 파일 바이트로 캐시 키를 만듭니다."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def preprocess_buffers(img):
+    """RGB 배열 → 그레이스케일 → 노이즈 제거 → 적응형 이진화 (중간 결과 모두 반환)"""
+    # 그레이스케일 변환
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+    # 노이즈 제거 및 대비 향상 (선명하게)
+    # 1. 노이즈 제거
+    denoised = cv2.fastNlMeansDenoising(gray, h=10)
+
+    # 2. 적응형 이진화 (글자를 더 뚜렷하게)
+    thresh = cv2.adaptiveThreshold(
+        denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY, 11, 2
+    )
+    return {"gray": gray, "denoised": denoised, "thresh": thresh}
+
+
+def preprocess_image(img):
+    return preprocess_buffers(img)["thresh"]
+
+
+class BufferCache:
+    """이미지 해시 → 전처리 버퍼 LRU 캐시 (전체 바이트 수 max_bytes 이하로 유지)"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(buffers):
+        return sum(buf.nbytes for buf in buffers.values())
+
+    def get(self, key):
+        with self._lock:
+            buffers = self._items.get(key)
+            if buffers is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return buffers
+
+    def put(self, key, buffers):
+        with self._lock:
+            self._items[key] = buffers
+            self._items.move_to_end(key)
+            while len(self._items) > 1 and self.nbytes() > self.max_bytes:
+                self._items.popitem(last=False)
+
+    def nbytes(self):
+        return sum(self._size(buffers) for buffers in self._items.values())
+
+
+def make_tiles(height, width, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """겹치는 타일 좌표 (x0, y0, x1, y1) 목록"""
+    step = tile_size - overlap
+
+    def _starts(length):
+        if length <= tile_size:
+            return [0]
+        # 마지막 타일은 이미지 끝에 맞춰서 가장자리가 빠지지 않게 함
+        return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in _starts(height) for x in _starts(width)
+    ]
+
+
+def detect_text(reader, processed):
+    """글자 위치만 검출합니다. 반환값: (horizontal_list, free_list)"""
+    horizontal_list, free_list = reader.detect(processed)
+    return horizontal_list[0], free_list[0]
+
+
+def recognize_text(reader, processed, detection, **kwargs):
+    """검출 결과를 재사용해서 글자를 인식합니다. (paragraph=True 등 readtext 인식 옵션 사용 가능)"""
+    horizontal_list, free_list = detection
+    return reader.recognize(processed, horizontal_list, free_list, **kwargs)
+
+
+def _init_worker(langs):
+    global _reader
+    import easyocr
+    _reader = easyocr.Reader(langs, gpu=False, verbose=False)
+
+
+def _preprocess_tile(tile):
+    """(워커 프로세스) 타일 전처리"""
+    return preprocess_buffers(tile)
+
+
+def _ocr_tile(processed, offset):
+    """(워커 프로세스) 전처리된 타일에서 검출 + 줄 단위 인식 후, 좌표를 원본 이미지 기준으로 옮겨 반환"""
+    t0 = time.perf_counter()
+    horizontal_list, free_list = detect_text(_reader, processed)
+    t1 = time.perf_counter()
+    result = recognize_text(_reader, processed, (horizontal_list, free_list))
+    t2 = time.perf_counter()
+
+    ox, oy = offset
+    horizontal_list = [[x0 + ox, x1 + ox, y0 + oy, y1 + oy] for x0, x1, y0, y1 in horizontal_list]
+    free_list = [[[x + ox, y + oy] for x, y in box] for box in free_list]
+    shifted = [
+        ([[float(x) + ox, float(y) + oy] for x, y in bbox], text, float(prob))
+        for bbox, text, prob in result
+    ]
+    return (horizontal_list, free_list), shifted, {"detect": t1 - t0, "recognize": t2 - t1}
+
+
+def _rect(bbox):
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _overlaps(a, b, threshold):
+    """두 사각형이 작은 쪽 면적의 threshold 이상 겹치는지"""
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return False
+    area_a = max((a[2] - a[0]) * (a[3] - a[1]), 1e-6)
+    area_b = max((b[2] - b[0]) * (b[3] - b[1]), 1e-6)
+    return iw * ih / min(area_a, area_b) >= threshold
+
+
+def _dedupe(items, rect_fn, threshold):
+    """앞쪽(우선순위가 높은) 항목과 겹치는 뒤쪽 항목을 제거합니다."""
+    kept, kept_rects = [], []
+    for item in items:
+        rect = rect_fn(item)
+        if not any(_overlaps(rect, other, threshold) for other in kept_rects):
+            kept.append(item)
+            kept_rects.append(rect)
+    return kept
+
+
+def merge_results(results, overlap_threshold=0.6):
+    """타일 경계에서 중복 인식된 박스를 제거합니다.
+
+    두 박스가 작은 쪽 면적의 overlap_threshold 이상 겹치면 같은 글자로 보고 신뢰도가 높은 쪽만 남깁니다.
+    """
+    kept = _dedupe(sorted(results, key=lambda r: -r[2]), lambda r: _rect(r[0]), overlap_threshold)
+    # 읽는 순서(위 → 아래, 왼쪽 → 오른쪽)로 정렬
+    return sorted(kept, key=lambda r: (round(_rect(r[0])[1] / 10), _rect(r[0])[0]))
+
+
+def merge_detections(detections, overlap_threshold=0.6):
+    """타일별 검출 결과를 합칩니다. 겹치는 박스는 더 큰 쪽(타일 경계에 잘리지 않은 쪽)을 남깁니다."""
+    horizontal = [box for h, _ in detections for box in h]
+    free = [box for _, f in detections for box in f]
+
+    def h_rect(box):
+        return box[0], box[2], box[1], box[3]
+
+    def area(rect):
+        return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+    horizontal = _dedupe(sorted(horizontal, key=lambda b: -area(h_rect(b))), h_rect, overlap_threshold)
+    free = _dedupe(sorted(free, key=lambda b: -area(_rect(b))), _rect, overlap_threshold)
+    return horizontal, free
+
+
+def create_pool(workers, langs=OCR_LANGS):
+    """워커마다 Reader 를 1회 로드하는 프로세스 풀 (torch 가 fork 와 충돌하지 않게 spawn 사용)"""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(langs,),
+    )
+
+
+def preprocess(img, pool=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """전처리 버퍼(gray / denoised / thresh)를 만듭니다. 큰 이미지는 타일별로 프로세스 풀에서 병렬 처리합니다."""
+    height, width = img.shape[:2]
+    tiles = make_tiles(height, width, tile_size, overlap)
+    if pool is None or len(tiles) == 1:
+        return preprocess_buffers(img)
+
+    futures = [pool.submit(_preprocess_tile, img[y0:y1, x0:x1]) for x0, y0, x1, y1 in tiles]
+    buffers = {name: np.empty((height, width), dtype=np.uint8) for name in BUFFER_NAMES}
+    for (x0, y0, x1, y1), future in zip(tiles, futures):
+        # 타일 가장자리는 노이즈 제거/적응형 이진화 결과가 어긋나므로 안쪽만 씀
+        # (이미지 끝이 아닌 쪽은 overlap // 2 씩 잘라냄 → 이웃 타일의 안쪽끼리 빈틈없이 이어짐)
+        ix0 = x0 if x0 == 0 else x0 + overlap // 2
+        iy0 = y0 if y0 == 0 else y0 + overlap // 2
+        ix1 = x1 if x1 == width else x1 - overlap // 2
+        iy1 = y1 if y1 == height else y1 - overlap // 2
+        for name, tile_buf in future.result().items():
+            buffers[name][iy0:iy1, ix0:ix1] = tile_buf[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+    return buffers
+
+
+def run_ocr(img, pool=None, reader=None, buffers=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """이미지를 타일로 나눠 OCR 을 수행합니다.
+
+    buffers 에 미리 전처리된 결과를 넘기면 전처리를 건너뜁니다.
+    타일이 1개뿐이거나 pool 이 없으면 reader 로 현재 프로세스에서 바로 처리합니다.
+    반환값: (OCR 결과 목록, 전처리 버퍼 dict, 검출 결과, 단계별 소요 시간 dict)
+    """
+    timings = {}
+    height, width = img.shape[:2]
+
+    t0 = time.perf_counter()
+    if buffers is None:
+        buffers = preprocess(img, pool, tile_size, overlap)
+        timings["preprocess"] = time.perf_counter() - t0
+    else:
+        timings["preprocess"] = 0.0
+    processed = buffers["thresh"]
+
+    tiles = make_tiles(height, width, tile_size, overlap)
+    timings["tiles"] = len(tiles)
+
+    if pool is None or len(tiles) == 1:
+        t1 = time.perf_counter()
+        detection = detect_text(reader, processed)
+        t2 = time.perf_counter()
+        results = recognize_text(reader, processed, detection)
+        timings["detect"] = t2 - t1
+        timings["recognize"] = time.perf_counter() - t2
+        return results, buffers, detection, timings
+
+    # 1. 타일별 검출 + 인식을 프로세스 풀에서 병렬 실행
+    t1 = time.perf_counter()
+    futures = [
+        pool.submit(_ocr_tile, processed[y0:y1, x0:x1], (x0, y0))
+        for x0, y0, x1, y1 in tiles
+    ]
+    outputs = [future.result() for future in futures]
+    timings["parallel_wall"] = time.perf_counter() - t1
+    timings["detect"] = sum(o[2]["detect"] for o in outputs)
+    timings["recognize"] = sum(o[2]["recognize"] for o in outputs)
+
+    # 2. 타일 경계 중복 박스 제거
+    t2 = time.perf_counter()
+    results = merge_results([r for o in outputs for r in o[1]])
+    detection = merge_detections([o[0] for o in outputs])
+    timings["merge"] = time.perf_counter() - t2
+    return results, buffers, detection, timings
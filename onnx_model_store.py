@@ -0,0 +1,114 @@
+"""
+로컬 ONNX 모델 저장소
+
+- 모델은 네트워크에서 받지 않고 저장소 안에 포함된 파일(BUNDLED_MODELS)에서 가져옵니다.
+- 저장소 폴더(MODEL_STORE_DIR)로 복사할 때 sha256 체크섬을 검증하고,
+  파일 잠금 + 임시 파일 rename 으로 여러 Streamlit 워커가 동시에 시작해도 반쪽 파일이 생기지 않게 합니다.
+- 첫 로드 때 onnxruntime 이 최적화한 그래프를 *.opt.onnx 로 저장해 두고,
+  다음부터는 최적화 단계를 건너뛰고 바로 로드합니다.
+"""
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import onnxruntime as ort
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", os.path.join(BASE_DIR, ".model_store"))
+
+# 이름 -> (저장소에 포함된 원본 경로, sha256)
+BUNDLED_MODELS = {
+    "mnist_cnn": (
+        os.path.join(BASE_DIR, "codeit", "미션16", "onnx", "mnist_cnn.onnx"),
+        "f46d92cc22bdb786493a1084bbc376ba1734f6edb28e1e6184a6f6bcf1a75687",
+    ),
+}
+
+
+def sha256sum(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelStore:
+    def __init__(self, root=MODEL_STORE_DIR, models=BUNDLED_MODELS):
+        self.root = root
+        self.models = models
+        self._verified = set()
+        os.makedirs(root, exist_ok=True)
+
+    @contextmanager
+    def _lock(self, name):
+        """같은 모델을 여러 프로세스가 동시에 쓰지 않도록 파일 잠금"""
+        with open(os.path.join(self.root, f"{name}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _atomic_write(self, path, write_fn):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_fn(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def resolve(self, name):
+        """체크섬이 검증된 저장소 내 모델 경로를 반환합니다. 없거나 손상됐으면 원본에서 다시 복사합니다."""
+        if name not in self.models:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+        source, checksum = self.models[name]
+        path = os.path.join(self.root, f"{name}.onnx")
+        if path in self._verified:
+            return path
+
+        with self._lock(name):
+            if not (os.path.exists(path) and sha256sum(path) == checksum):
+                if sha256sum(source) != checksum:
+                    raise ValueError(f"원본 모델 체크섬이 일치하지 않습니다: {source}")
+                self._atomic_write(path, lambda tmp: shutil.copyfile(source, tmp))
+                # 원본이 바뀌었을 수 있으니 이전 최적화 그래프는 버림
+                optimized = self.optimized_path(name)
+                if os.path.exists(optimized):
+                    os.remove(optimized)
+
+        self._verified.add(path)
+        return path
+
+    def optimized_path(self, name):
+        return os.path.join(self.root, f"{name}.opt.onnx")
+
+    def create_session(self, name, intra_op_threads=1):
+        """모델 세션을 생성합니다. 최적화 그래프가 있으면 그것을, 없으면 최적화하면서 저장합니다."""
+        path = self.resolve(name)
+        optimized = self.optimized_path(name)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+
+        if not os.path.exists(optimized):
+            with self._lock(name):
+                if not os.path.exists(optimized):
+                    # EXTENDED 까지가 다른 CPU 에서도 재사용 가능한 오프라인 최적화 수준
+                    build_options = ort.SessionOptions()
+                    build_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+
+                    def _build(tmp_path):
+                        build_options.optimized_model_filepath = tmp_path
+                        ort.InferenceSession(path, sess_options=build_options, providers=["CPUExecutionProvider"])
+
+                    self._atomic_write(optimized, _build)
+
+        # 이미 최적화된 그래프이므로 다시 최적화하지 않음
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return ort.InferenceSession(optimized, sess_options=options, providers=["CPUExecutionProvider"])
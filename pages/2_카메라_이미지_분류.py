@@ -1,19 +1,19 @@
 import streamlit as st
-from PIL import Image
-from utils import get_image_classifier, classify_and_show
+from utils import get_image_classifier, classify_and_show, render_profiling_toggle, prepare_image
 
 st.title("📸 카메라 이미지 분류")
 
 model = get_image_classifier()
+render_profiling_toggle()
 
 camera_file = st.camera_input("사진 찍기")
 
 if camera_file:
-    image = Image.open(camera_file)
+    image, model_image = prepare_image(camera_file)
     st.image(image, caption="찍은 사진", width="stretch")
 
     if st.button("분류하기"):
-        classify_and_show(image, model, title=camera_file.name)
+        classify_and_show(model_image, model, title=camera_file.name)
         # results = classifier(image)
         # st.subheader("🔎 결과")
         # for result in results:
@@ -1,6 +1,5 @@
 import streamlit as st
-from PIL import Image
-from utils import get_image_classifier, classify_image, s_show
+from utils import get_image_classifier, iter_classify_images, make_thumbnail, s_show, DEFAULT_BATCH_SIZE
 
 st.title("📂 여러 이미지 한 번에 분류")
 
@@ -9,6 +8,8 @@ model = get_image_classifier()
 # session_state 초기화
 if "results" not in st.session_state:
     st.session_state.results = []
+if "batch_timings" not in st.session_state:
+    st.session_state.batch_timings = []
 
 # 🔎 결과 먼저 출력
 if st.session_state.results:
@@ -16,6 +17,10 @@ if st.session_state.results:
     for idx, (file_name, image, df) in enumerate(st.session_state.results):
         s_show(idx, file_name, image, df)
 
+if st.session_state.batch_timings:
+    with st.expander("⏱ 배치별 추론 시간"):
+        st.dataframe(st.session_state.batch_timings)
+
 # # 여러 파일 업로드 허용
 # uploaded_files = st.file_uploader(
 #     "이미지를 여러 장 업로드하세요",
@@ -31,18 +36,33 @@ with st.sidebar:
         accept_multiple_files=True
     )
 
+    batch_size = st.slider("배치 크기", min_value=1, max_value=32, value=DEFAULT_BATCH_SIZE)
+
     classify_clicked = st.button("분류하기")
+    # 분류 도중 누르면 스크립트가 다시 실행되면서 진행 중인 분류가 중단됨 (완료된 결과는 유지)
+    st.button("⏹ 분류 취소")
 
 # if uploaded_files and st.button("분류하기"):
 if uploaded_files and classify_clicked:
     # st.session_state.results = []  # 이전 결과 초기화
 
-    for file in uploaded_files:
-        image = Image.open(file)
-        df = classify_image(image, model)
+    timings = []
+    progress = st.progress(0.0, text="분류를 시작합니다...")
+    live_results = st.container()
+
+    # 디코딩/분류가 끝나는 대로 결과 카드를 하나씩 출력
+    # 세션에는 원본 대신 썸네일과 Top-k 표만 저장해서 업로드가 늘어도 메모리가 일정하게 유지됨
+    total = len(uploaded_files)
+    for done, (file_name, image, df) in enumerate(
+        iter_classify_images(uploaded_files, model, batch_size=batch_size, timings=timings), start=1
+    ):
+        thumb = make_thumbnail(image)
+        idx = len(st.session_state.results)
+        st.session_state.results.append((file_name, thumb, df))
+        st.session_state.batch_timings = timings
 
-        st.session_state.results.append(
-            (file.name, image, df)
-        )
+        with live_results:
+            s_show(idx, file_name, thumb, df)
+        progress.progress(done / total, text=f"{done}/{total}장 분류 완료")
 
 #     st.rerun()  # ✅ 최신 API
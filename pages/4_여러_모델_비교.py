@@ -1,7 +1,9 @@
 import streamlit as st
-from utils import get_image_classifier, run_inference
-from PIL import Image
+from utils import get_model_registry, compare_models, render_profiling_toggle, is_profiling_enabled, prepare_image, MODEL_CANDIDATES
+from model_backends import BACKENDS, DEFAULT_BACKEND
 import pandas as pd
+import time
+import os
 
 # 페이지 설정
 st.set_page_config(page_title="이미지 분류 App", layout="centered", page_icon="🖼️")
@@ -9,18 +11,6 @@ st.set_page_config(page_title="이미지 분류 App", layout="centered", page_ic
 # 제목
 st.title("🖼️ 이미지 분류 모델 비교")
 
-MODEL_CANDIDATES = {
-    #Transformer 계열
-    "ViT": "google/vit-base-patch16-224",# 기본값
-    "Swin": "microsoft/swin-base-patch4-window7-224",# Swin 모델(고급 느림)
-    "DeiT": "facebook/deit-base-distilled-patch16-224",# DeiT 모델(효율적 트랜스포머)
-    # CNN 계열
-    "ResNet50": "microsoft/resnet-50",# ResNet50 모델(빠르고 가벼움)
-    "EfficientNet": "google/efficientnet-b0",# EfficientNet 모델(성능+속도 균형)
-    "ConvNeXt": "facebook/convnext-base-224",# ConvNeXt 모델(최신 아키텍처CNN)
-
-    # "clip": "openai/clip-vit-base-patch32" # CLIP 모델(멀티모달)-LABEL_0, LABEL_1 → 다른 모델과 직접 비교 불가
-}
 with st.sidebar:
     selected_models = st.multiselect(
         "비교할 모델 선택",
@@ -29,11 +19,24 @@ with st.sidebar:
         max_selections=6
     )
 
+    backend = st.selectbox("추론 백엔드", BACKENDS, index=BACKENDS.index(DEFAULT_BACKEND))
+    max_workers = st.slider("동시 실행 워커 수", 1, 6, min(len(selected_models), 3) or 1)
+    thread_budget = st.slider("전체 torch 스레드 수", 1, os.cpu_count() or 1, os.cpu_count() or 1)
+
+    render_profiling_toggle()
+
     uploaded_file = st.file_uploader("이미지 업로드")
     run = st.button("비교 실행")
 
+    with st.expander("🧠 모델 메모리 현황"):
+        stats = get_model_registry().stats()
+        resident = [f"{name} ({backend})" for name, backend in stats["resident_models"]]
+        st.write(f"상주 모델: {', '.join(resident) or '-'}")
+        st.write(f"사용 메모리: {stats['resident_bytes'] / 1024**2:.0f}MB / {stats['budget_bytes'] / 1024**2:.0f}MB")
+        st.write(f"로드 {stats['loads']}회 · 해제 {stats['evictions']}회 · 재사용 {stats['hits']}회")
+
 if uploaded_file and run:
-    image = Image.open(uploaded_file)
+    image, model_image = prepare_image(uploaded_file)
     st.image(image, caption=f"업로드된 이미지{uploaded_file.name}", width='stretch')
     # cols = st.columns(len(selected_models))
     # cols = st.columns(3)
@@ -52,22 +55,29 @@ if uploaded_file and run:
     summary_rows = []
     detail_results = []
 
-    for model_key in selected_models:
-        model_name = MODEL_CANDIDATES[model_key]
-        model = get_image_classifier(model_name)
-        df, elapsed, _ = run_inference(image, model)
-
+    st.subheader("📋 모델별 요약 비교")
+    table = st.empty()
+
+    # 끝나는 모델부터 요약 표에 한 줄씩 추가
+    wall_start = time.perf_counter()
+    # 모델은 작업마다 저장소에서 빌려 쓰므로 메모리 예산 안에 들어가는 만큼만 동시에 올라감
+    for model_key, df, timing in compare_models(
+        model_image, selected_models, backend=backend, max_workers=max_workers,
+        thread_budget=thread_budget, profile=is_profiling_enabled()
+    ):
         summary_rows.append({
             "모델": model_key,
             "Top-1": df.iloc[0]["label"],
             "확률": round(df.iloc[0]["score"], 3),
-            "추론시간(s)": round(elapsed, 3),
+            "대기시간(s)": round(timing["queue"], 3),
+            "로딩시간(s)": round(timing["load"], 3),
+            "추론시간(s)": round(timing["compute"], 3),
         })
-        detail_results.append((model_key, model_name, df, elapsed))
-    
-    summary_df = pd.DataFrame(summary_rows)
-    st.subheader("📋 모델별 요약 비교")
-    st.dataframe(summary_df)
+        detail_results.append((model_key, MODEL_CANDIDATES[model_key], df, timing["compute"]))
+        table.dataframe(pd.DataFrame(summary_rows))
+    wall_time = time.perf_counter() - wall_start
+
+    st.metric("⏱ 전체 소요 시간", f"{wall_time:.3f}s")
 
     for model_key, model_name, df, elapsed in detail_results:
         with st.expander(f"🔍 {model_key} 상세 결과"):
@@ -1,34 +1,34 @@
 import streamlit as st
 from streamlit_drawable_canvas import st_canvas
-import onnxruntime as ort
 import numpy as np
-from PIL import Image
-import requests
-import os
+import hashlib
 import pandas as pd
+from mnist_onnx import MnistOnnxClassifier
+from onnx_model_store import ModelStore
 
 # 1. 페이지 설정
 st.set_page_config(page_title="MNIST 손글씨 인식기", layout="wide")
 st.title("🖋️ MNIST 손글씨 숫자 인식 서비스")
 
-# 2. 모델 다운로드 및 로드 (캐싱)
-MODEL_URL = "https://github.com/onnx/models/raw/main/validated/vision/classification/mnist/model/mnist-8.onnx"
-MODEL_PATH = "mnist.onnx"
+# 2. 모델 로드 (캐싱)
+# 네트워크에서 받지 않고, 저장소에 포함된 미션16 모델을 체크섬 검증 후 로컬 모델 저장소에서 로드
+# MODEL_URL = "https://github.com/onnx/models/raw/main/validated/vision/classification/mnist/model/mnist-8.onnx"
+MODEL_NAME = "mnist_cnn"
 
 @st.cache_resource
 def load_onnx_model():
-    if not os.path.exists(MODEL_PATH):
-        with st.spinner("모델 다운로드 중..."):
-            response = requests.get(MODEL_URL)
-            with open(MODEL_PATH, "wb") as f:
-                f.write(response.content)
-    return ort.InferenceSession(MODEL_PATH)
+    session = ModelStore().create_session(MODEL_NAME, intra_op_threads=1)
+    # 입력/출력 이름, 입력 버퍼를 한 번만 준비해 두는 래퍼
+    return MnistOnnxClassifier(session)
 
-session = load_onnx_model()
+classifier = load_onnx_model()
 
 # 세션 상태 초기화 (이미지 저장소용)
 if "history" not in st.session_state:
     st.session_state.history = []
+# 마지막으로 추론한 캔버스 (픽셀이 바뀌었을 때만 다시 추론)
+if "last_canvas" not in st.session_state:
+    st.session_state.last_canvas = None
 
 # 레이아웃 나누기
 col1, col2 = st.columns([1, 1])
@@ -52,22 +52,19 @@ with col2:
     if canvas_result.image_data is not None:
         st.subheader("2. 전처리 이미지")
         
-        # 4. 이미지 전처리
-        # RGBA -> Gray -> Resize(28x28) -> Normalize
-        img = Image.fromarray(canvas_result.image_data.astype('uint8')).convert('L')
-        img_resized = img.resize((28, 28))
+        # 4. 이미지 전처리 + 5. 모델 추론
+        # RGBA -> Gray -> Resize(28x28) -> Normalize 를 NumPy 한 번에 처리
+        # 캔버스 픽셀이 그대로면 (버튼 클릭 등으로 인한 재실행) 이전 결과 재사용
+        canvas_key = hashlib.blake2b(canvas_result.image_data.tobytes(), digest_size=16).hexdigest()
+        last = st.session_state.last_canvas
+        if last is None or last["key"] != canvas_key:
+            probabilities, digit = classifier.predict(canvas_result.image_data.astype('uint8'))
+            last = {"key": canvas_key, "probabilities": probabilities, "digit": digit}
+            st.session_state.last_canvas = last
+        probabilities, digit = last["probabilities"], last["digit"]
+        img_resized = (digit * 255).astype('uint8')
         st.image(img_resized, width=100) # 전처리 결과 표시
         
-        # 모델 입력 형식으로 변환 (1, 1, 28, 28)
-        img_array = np.array(img_resized).astype('float32')
-        img_array = img_array.reshape(1, 1, 28, 28)
-        img_array /= 255.0  # 정규화
-        
-        # 5. 모델 추론
-        input_name = session.get_inputs()[0].name
-        outputs = session.run(None, {input_name: img_array})
-        probabilities = np.exp(outputs[0][0]) / np.sum(np.exp(outputs[0][0])) # Softmax
-        
         # 결과 표시
         st.subheader("3. 모델 추론 결과")
         prediction = np.argmax(probabilities)
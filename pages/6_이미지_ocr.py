@@ -1,63 +1,79 @@
 import streamlit as st
 import easyocr
 import numpy as np
+import os
+import time
 from PIL import Image
-import cv2
+from ocr_pipeline import OCR_LANGS, BufferCache, create_pool, image_key, preprocess, recognize_text, run_ocr
 
 st.title("📑 이미지 OCR 서비스")
 st.write("텍스트 이미지를 업로드하면 글자를 추출합니다.")
 
+# 타일 병렬 OCR 워커 프로세스 수 (각 워커가 Reader 를 따로 로드하므로 메모리 사용량에 주의)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 2))
+# 전처리 버퍼 캐시 최대 용량 (MB)
+OCR_BUFFER_CACHE_MB = int(os.getenv("OCR_BUFFER_CACHE_MB", 256))
+
 # 모델 로드 (한국어, 영어 선택)
 @st.cache_resource
 def load_ocr_reader():
-    return easyocr.Reader(['ko', 'en'])
+    return easyocr.Reader(OCR_LANGS)
+
+@st.cache_resource
+def load_ocr_pool():
+    return create_pool(OCR_WORKERS)
+
+@st.cache_resource
+def load_buffer_cache():
+    """이미지 해시별 전처리 결과(gray / denoised / thresh) 캐시"""
+    return BufferCache(max_bytes=OCR_BUFFER_CACHE_MB * 1024 * 1024)
 
 reader = load_ocr_reader()
+buffer_cache = load_buffer_cache()
 
 uploaded_file = st.file_uploader("텍스트 이미지 업로드", type=["jpg", "jpeg", "png"])
 
-def preprocess_image(image):
-    # PIL 이미지를 numpy 배열로 변환
-    img = np.array(image)
-    
-    # 그레이스케일 변환
-    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    
-    # 노이즈 제거 및 대비 향상 (선명하게)
-    # 1. 노이즈 제거
-    denoised = cv2.fastNlMeansDenoising(gray, h=10)
-    
-    # 2. 적응형 이진화 (글자를 더 뚜렷하게)
-    thresh = cv2.adaptiveThreshold(
-        denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-        cv2.THRESH_BINARY, 11, 2
-    )
-    
-    return thresh
-
 if uploaded_file:
-    image = Image.open(uploaded_file)
+    image = Image.open(uploaded_file).convert("RGB")
+    img_np = np.array(image)
     st.image(image, caption="업로드된 이미지", use_container_width=True)
-    processed_img = preprocess_image(image)
-    st.image(processed_img, caption="전처리된 이미지") # 전처리 결과 확인용
+
+    # 전처리는 이미지마다 1번만 (버튼 클릭 등으로 재실행돼도 캐시에서 꺼내 씀)
+    key = image_key(uploaded_file.getvalue())
+    start = time.perf_counter()
+    buffers = buffer_cache.get(key)
+    preprocess_cached = buffers is not None
+    if buffers is None:
+        buffers = preprocess(img_np, pool=load_ocr_pool())
+        buffer_cache.put(key, buffers)
+    preprocess_time = time.perf_counter() - start
+    st.image(buffers["thresh"], caption="전처리된 이미지") # 전처리 결과 확인용
     
     if st.button("글자 추출하기"):
         with st.spinner("글자를 읽고 있습니다..."):
-            # # PIL 이미지를 numpy 배열로 변환
-            # img_np = np.array(image)
-            # result = reader.readtext(img_np)
-            result = reader.readtext(processed_img) # 전처리된 이미지를 OCR에 전달
+            # 큰 이미지는 겹치는 타일로 나눠 검출 + 인식을 프로세스 풀에서 병렬 처리
+            result, buffers, detection, timings = run_ocr(img_np, pool=load_ocr_pool(), reader=reader, buffers=buffers)
+            timings["preprocess"] = preprocess_time
+            timings["preprocess_cache"] = "hit" if preprocess_cached else "miss"
+
             st.subheader("추출된 텍스트")
             for (bbox, text, prob) in result:
                 st.write(f"- {text} (신뢰도: {prob:.2f})")
             
             # paragraph=True: 흩어진 단어들을 문장 단위로 묶어서 인식 시도
             # detail=1: 위치 정보까지 포함 (0으로 하면 텍스트만 깔끔하게 나옴)
-            result1 = reader.readtext(img_np, paragraph=True, decoder='wordbeamsearch')
+            # 이미 전처리된 이미지 + 위에서 검출한 글자 위치를 그대로 재사용 (검출 2번 X)
+            start = time.perf_counter()
+            result1 = recognize_text(reader, buffers["thresh"], detection, paragraph=True, decoder='wordbeamsearch')
+            timings["recognize_paragraph"] = time.perf_counter() - start
+            timings["detection_reused"] = True
             st.subheader("추출된 텍스트1")
             for (bbox, text, prob) in result1:
                 st.write(f"- {text} (신뢰도: {prob:.2f})")
 
+            with st.expander("⏱ 단계별 소요 시간"):
+                st.json({k: round(v, 3) if isinstance(v, float) else v for k, v in timings.items()})
+
 '''
 3. 더 강력한 모델 추천: PaddleOCR (한국어 표 인식 강자)
 만약 "표"를 제대로 읽는 서비스가 목표라면, 현업에서 가장 많이 쓰이는 PaddleOCR을 추천합니다. EasyOCR보다 설치는 조금 까다롭지만, 한국어와 표(Table) 구조 인식률이 압도적으로 높습니다.
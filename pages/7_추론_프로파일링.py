@@ -0,0 +1,43 @@
+import streamlit as st
+import plotly.express as px
+from profiling import PROFILER, STAGES
+from utils import render_profiling_toggle
+
+st.title("🔬 추론 프로파일링 대시보드")
+st.write("사이드바에서 프로파일링 모드를 켜고 분류 페이지를 사용하면, 단계별 추론 시간이 여기에 쌓입니다.")
+
+render_profiling_toggle()
+
+summary_df = PROFILER.summary()
+records_df = PROFILER.records()
+
+if summary_df.empty:
+    st.info("아직 기록된 추론이 없습니다.")
+else:
+    # 1. 모델별 단계 백분위 요약
+    st.subheader("📋 단계별 지연 시간 (p50 / p95 / p99)")
+    model_filter = st.selectbox("모델", ["전체"] + sorted(summary_df["모델"].unique()))
+    view_df = summary_df if model_filter == "전체" else summary_df[summary_df["모델"] == model_filter]
+    st.dataframe(view_df, width="stretch")
+
+    # 2. 단계별 p50 비교 차트 (total 제외)
+    stage_df = view_df[view_df["단계"].isin(STAGES)]
+    fig = px.bar(stage_df, x="모델", y="p50(ms)", color="단계", title="모델별 단계 p50 (ms)")
+    st.plotly_chart(fig, key="stage_p50")
+
+    # 3. 최근 기록 (스레드 수, 최대 메모리 포함)
+    st.subheader("🧾 최근 추론 기록")
+    st.dataframe(records_df.tail(50), width="stretch")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "📥 CSV 내보내기",
+            data=records_df.to_csv(index=False).encode("utf-8-sig"),
+            file_name="inference_profile.csv",
+            mime="text/csv",
+        )
+    with col2:
+        if st.button("🧹 기록 초기화"):
+            PROFILER.reset()
+            st.rerun()
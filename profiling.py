@@ -0,0 +1,105 @@
+import resource
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+import torch
+
+STAGES = ("decode", "preprocess", "forward", "postprocess")
+
+
+def peak_rss_mb():
+    """프로세스 최대 메모리 사용량(MB) - 리눅스 기준 ru_maxrss 는 KB 단위"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class InferenceProfiler:
+    """모델별/단계별 추론 시간을 최근 window 개까지 모아 p50/p95/p99 를 계산합니다."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))  # (모델, 단계) -> ms 목록
+        self._records = deque(maxlen=window * 4)  # CSV 내보내기용 원본 기록
+
+    def record(self, model_name, stages_ns):
+        row = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "model": model_name,
+            "torch_threads": torch.get_num_threads(),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        total_ns = 0
+        with self._lock:
+            for stage, ns in stages_ns.items():
+                ms = ns / 1e6
+                self._samples[(model_name, stage)].append(ms)
+                row[f"{stage}_ms"] = round(ms, 3)
+                total_ns += ns
+            self._samples[(model_name, "total")].append(total_ns / 1e6)
+            row["total_ms"] = round(total_ns / 1e6, 3)
+            self._records.append(row)
+
+    def summary(self):
+        """모델/단계별 백분위 요약 DataFrame"""
+        with self._lock:
+            items = [(key, list(values)) for key, values in self._samples.items()]
+        rows = []
+        for (model_name, stage), values in sorted(items):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            rows.append({
+                "모델": model_name,
+                "단계": stage,
+                "횟수": len(values),
+                "p50(ms)": round(p50, 2),
+                "p95(ms)": round(p95, 2),
+                "p99(ms)": round(p99, 2),
+            })
+        return pd.DataFrame(rows)
+
+    def records(self):
+        with self._lock:
+            return pd.DataFrame(list(self._records))
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._records.clear()
+
+
+# 모듈 전역 저장소 (Streamlit 재실행 사이에도 유지, 워커 스레드에서도 접근 가능)
+PROFILER = InferenceProfiler()
+
+
+def profile_inference(image, model, model_name, top_k=5):
+    """파이프라인을 단계별(decode/preprocess/forward/postprocess)로 나눠 실행하며 시간을 잽니다."""
+    stages = {}
+
+    # utils.open_image 로 연 이미지는 이미 디코딩돼 있으므로 그때 잰 시간을 사용
+    decode_ns = getattr(image, "info", {}).get("decode_ns")
+    t0 = time.perf_counter_ns()
+    # PIL 은 지연 디코딩이라 여기서 강제로 디코딩
+    if hasattr(image, "load"):
+        image.load()
+    t1 = time.perf_counter_ns()
+    stages["decode"] = decode_ns if decode_ns is not None else t1 - t0
+
+    if all(hasattr(model, name) for name in ("preprocess", "forward", "postprocess")):
+        inputs = model.preprocess(image)
+        t2 = time.perf_counter_ns()
+        outputs = model.forward(inputs)
+        t3 = time.perf_counter_ns()
+        results = model.postprocess(outputs, top_k=top_k)
+        t4 = time.perf_counter_ns()
+        stages["preprocess"] = t2 - t1
+        stages["forward"] = t3 - t2
+        stages["postprocess"] = t4 - t3
+    else:
+        # ONNX 래퍼처럼 단계가 나뉘지 않은 모델은 전체를 forward 로 기록
+        results = model(image, top_k=top_k)
+        stages["forward"] = time.perf_counter_ns() - t1
+
+    PROFILER.record(model_name, stages)
+    return results
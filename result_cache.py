@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def image_hash(image):
+    """이미지 픽셀 내용으로 해시를 만듭니다. (같은 사진을 다시 올려도 같은 값)"""
+    h = hashlib.sha1()
+    h.update(f"{image.mode}:{image.size}".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+def make_key(image_digest, model_name, top_k):
+    return f"{image_digest}:{model_name}:{top_k}"
+
+
+class ResultCache:
+    """분류 결과 캐시 (메모리 LRU + 선택적 SQLite 디스크 계층)
+
+    - 메모리: 최근 사용 순으로 max_entries 개까지 유지
+    - 디스크: disk_path 를 주면 Streamlit 재시작 후에도 결과 유지
+    - ttl(초)이 지난 항목은 두 계층 모두에서 만료 처리
+    """
+
+    def __init__(self, max_entries=256, ttl=24 * 3600, disk_path=None, disk_max_entries=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_max_entries = disk_max_entries
+        self._memory = OrderedDict()  # key -> (저장 시각, results)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT, created_at REAL, accessed_at REAL)"
+            )
+            self._conn.commit()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            # 1. 메모리 계층
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, results = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return results
+                del self._memory[key]
+
+            # 2. 디스크 계층
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        results = json.loads(value)
+                        self._put_memory(key, created_at, results)
+                        self.hits += 1
+                        return results
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, results):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, now, results)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(results), now, now),
+                )
+                self._evict_disk(now)
+                self._conn.commit()
+
+    def _put_memory(self, key, created_at, results):
+        self._memory[key] = (created_at, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        # 개수 초과 시 가장 오래 안 쓴 항목부터 삭제
+        self._conn.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
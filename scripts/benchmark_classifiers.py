@@ -0,0 +1,165 @@
+"""
+🏁 이미지 분류 모델 오프라인 벤치마크
+
+페이지의 1장짜리 추론 시간은 첫 호출 워밍업이 섞여 있어 모델 선택 근거로 쓰기 어렵습니다.
+이 스크립트는 워밍업 후 반복 측정해서 모델별 처리량/지연 백분위/최대 메모리/로드 시간을 기록합니다.
+최대 메모리(ru_maxrss)는 프로세스 전체의 최고치라서, 모델마다 새 프로세스(spawn)에서 측정합니다.
+
+📌 실행 방법:
+python scripts/benchmark_classifiers.py --images ./samples --models ViT ResNet50 \
+    --batch-sizes 1 8 --threads 1 4 --output bench/result
+→ bench/result.json, bench/result.csv 생성 (커밋 해시/환경 정보 포함)
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+
+from model_backends import BACKENDS, DEFAULT_BACKEND
+from utils import MODEL_CANDIDATES, get_image_classifier
+
+
+def load_images(folder):
+    paths = sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith((".jpg", ".jpeg", ".png"))
+    )
+    if not paths:
+        raise SystemExit(f"❌ 이미지가 없습니다: {folder}")
+    return [Image.open(path).convert("RGB") for path in paths]
+
+
+def environment_info():
+    """다른 커밋과 결과를 비교할 수 있도록 실행 환경을 함께 기록합니다."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def benchmark_model(model, images, batch_size, warmup, iterations):
+    """워밍업 후 iterations 번 배치 추론하며 배치별 지연 시간(초)을 측정합니다."""
+    # 이미지 순서를 고정해서 실행마다 같은 입력을 사용
+    pool = itertools.cycle(images)
+    batches = [[next(pool) for _ in range(batch_size)] for _ in range(warmup + iterations)]
+
+    for batch in batches[:warmup]:
+        model(batch, batch_size=batch_size)
+
+    latencies = []
+    for batch in batches[warmup:]:
+        start = time.perf_counter()
+        model(batch, batch_size=batch_size)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+MEMORY_MEASUREMENT = "모델마다 별도 프로세스(spawn)에서 측정한 ru_maxrss (모델 로드 + 모든 threads/batch 설정 실행 후)"
+
+
+def run_model(model_key, args):
+    """(자식 프로세스) 모델 하나를 로드해서 threads x batch 조합별로 측정합니다."""
+    images = load_images(args.images)
+    model_name = MODEL_CANDIDATES[model_key]
+
+    start = time.perf_counter()
+    model = get_image_classifier(model_name, args.backend)
+    load_time = time.perf_counter() - start
+
+    rows = []
+    for threads, batch_size in itertools.product(args.threads, args.batch_sizes):
+        torch.set_num_threads(threads)
+        latencies = benchmark_model(model, images, batch_size, args.warmup, args.iterations)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+
+        row = {
+            "model": model_key,
+            "model_name": model_name,
+            "backend": args.backend,
+            "threads": threads,
+            "batch_size": batch_size,
+            "iterations": args.iterations,
+            "throughput_img_s": round(batch_size * len(latencies) / latencies.sum(), 2),
+            "p50_ms": round(p50, 2),
+            "p95_ms": round(p95, 2),
+            "p99_ms": round(p99, 2),
+            "load_time_s": round(load_time, 3),
+        }
+        rows.append(row)
+        print(
+            f"✅ {model_key:<12} threads={threads:<2} batch={batch_size:<3} "
+            f"{row['throughput_img_s']:>8} img/s  p50={row['p50_ms']}ms p99={row['p99_ms']}ms",
+            flush=True,
+        )
+
+    # 이 프로세스에는 이 모델 하나만 올라갔으므로 최고치가 곧 모델별 최대 메모리 (Linux: KB 단위)
+    peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    for row in rows:
+        row["peak_rss_mb"] = peak_rss_mb
+    return rows
+
+
+def benchmark_in_subprocess(model_key, args):
+    """앞에서 측정한 모델의 메모리가 섞이지 않도록 모델마다 새 프로세스에서 run_model 을 실행합니다."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_model, model_key, args).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MODEL_CANDIDATES 이미지 분류 모델 벤치마크")
+    parser.add_argument("--images", required=True, help="벤치마크용 이미지 폴더")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_CANDIDATES.keys()), choices=list(MODEL_CANDIDATES.keys()))
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=BACKENDS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--threads", nargs="+", type=int, default=[torch.get_num_threads()])
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", default="benchmark_result", help="결과 파일 경로 (확장자 제외)")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    env = environment_info()
+    env["memory_measurement"] = MEMORY_MEASUREMENT
+    print(f"🖼️ 이미지 {len(images)}장 / 커밋 {env['commit'][:8] or '-'} / CPU {env['cpu_count']}개")
+    print(f"🧠 peak_rss_mb: {MEMORY_MEASUREMENT}")
+
+    rows = []
+    for model_key in args.models:
+        rows.extend(benchmark_in_subprocess(model_key, args))
+
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(f"{args.output}.json", "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "results": rows}, f, ensure_ascii=False, indent=2)
+    pd.DataFrame(rows).assign(commit=env["commit"]).to_csv(f"{args.output}.csv", index=False)
+    print(f"📦 저장 완료: {args.output}.json / {args.output}.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,61 @@
-from transformers import pipeline
+import torch
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import time
+import os
+import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image, ImageOps
+from emoji_worker import EmojiCategoryWorker
+from model_backends import DEFAULT_BACKEND, load_classifier
+from model_registry import ModelRegistry
+from profiling import profile_inference
+from result_cache import ResultCache, image_hash, make_key
 
 # 기본 모델 설정
 DEFAULT_MODEL = "google/vit-base-patch16-224"
 
+# 비교용 이미지 분류 모델 후보
+MODEL_CANDIDATES = {
+    #Transformer 계열
+    "ViT": "google/vit-base-patch16-224",# 기본값
+    "Swin": "microsoft/swin-base-patch4-window7-224",# Swin 모델(고급 느림)
+    "DeiT": "facebook/deit-base-distilled-patch16-224",# DeiT 모델(효율적 트랜스포머)
+    # CNN 계열
+    "ResNet50": "microsoft/resnet-50",# ResNet50 모델(빠르고 가벼움)
+    "EfficientNet": "google/efficientnet-b0",# EfficientNet 모델(성능+속도 균형)
+    "ConvNeXt": "facebook/convnext-base-224",# ConvNeXt 모델(최신 아키텍처CNN)
+
+    # "clip": "openai/clip-vit-base-patch32" # CLIP 모델(멀티모달)-LABEL_0, LABEL_1 → 다른 모델과 직접 비교 불가
+}
+
+# 동시에 메모리에 올려 둘 분류 모델의 최대 용량 (MB)
+MODEL_RAM_BUDGET_MB = int(os.getenv("MODEL_RAM_BUDGET_MB", 1024))
+
+# LLM 카테고리 분류 결과 저장 위치 / 결과를 기다리는 동안 보여줄 이모지
+EMOJI_CATEGORY_DB = os.getenv("EMOJI_CATEGORY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".emoji_categories.db"))
+PLACEHOLDER_EMOJI = "⏳"
+EMOJI_WAIT_TIMEOUT = 10
+
+# 여러 이미지 분류 시 한 번에 모델에 넣을 이미지 수
+DEFAULT_BATCH_SIZE = 8
+# 이미지 디코딩 병렬 처리 스레드 수
+DECODE_WORKERS = 4
+# 화면 표시용 이미지 최대 크기 / 모델 입력용 이미지 짧은 변 크기
+# (모델 전처리가 어차피 224px 로 줄이므로, 크롭 여유(224/0.875)를 둔 256px 이면 충분)
+DISPLAY_MAX_SIZE = 1024
+MODEL_MIN_EDGE = 256
+
+# 결과 카드/세션에 저장할 축소 이미지 크기
+THUMBNAIL_SIZE = (400, 400)
+
+# 분류 결과 캐시 설정 (RESULT_CACHE_DB 경로를 지정하면 재시작 후에도 유지되는 디스크 캐시 사용)
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 24 * 3600))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB")
+
 # 자주 나오는 핵심 키워드 매핑 (ImageNet 기반)
 EMOJI_KEYWORD_MAP = {
     # 동물
@@ -35,49 +84,136 @@ EMOJI_KEYWORD_MAP = {
 }
 
 @st.cache_resource
-def get_image_classifier(model_name=DEFAULT_MODEL):
-    """이미지 분류 모델을 로드하고 캐싱합니다."""
-    return pipeline("image-classification", model=model_name)
+def get_model_registry():
+    """메모리 예산이 있는 모델 저장소를 생성하고 캐싱합니다."""
+    return ModelRegistry(budget_bytes=MODEL_RAM_BUDGET_MB * 1024 * 1024)
+
+def get_image_classifier(model_name=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+    """이미지 분류 모델을 모델 저장소에서 가져옵니다. (예산 초과 시 오래 안 쓴 모델부터 내림)
+
+    backend: "torch-fp32", "torch-int8-dynamic", "onnxruntime"
+    """
+    return get_model_registry().get(
+        (model_name, backend), lambda: load_classifier(model_name, backend)
+    )
 
 @st.cache_resource
-def get_emoji_pipeline():
-    """텍스트를 이모지로 변환하는 모델을 로드하고 캐싱합니다."""
-    return pipeline("text2text-generation", model="google/flan-t5-small")
+def get_result_cache():
+    """분류 결과 캐시를 생성하고 캐싱합니다."""
+    return ResultCache(max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, disk_path=RESULT_CACHE_DB)
 
-def get_emoji_from_labels(labels):
-    label_text = ", ".join(labels).lower()
-    
-    # 1. 키워드 기반 즉시 매핑 (가장 정확하고 빠름)
-    for keyword, emoji in EMOJI_KEYWORD_MAP.items():
-        if keyword in label_text:
-            return emoji
-
-    # 2. 키워드가 없을 때만 LLM(flan-t5-small)에게 "단어"를 물어본 뒤 변환
-    # 이모지 대신 "animal" 같은 단어를 뱉으라고 시키는 게 T5에게는 훨씬 쉽습니다.
-    pipe = get_emoji_pipeline()
-    prompt = (
-        "Classify the following items into one simple category word (e.g., animal, vehicle, food, tool, nature, building, person, or object).\n"
-        f"Items: {label_text}\n"
-        "Category:"
+def get_model_name(model):
+    """파이프라인이 사용하는 모델 이름(허브 ID)을 반환합니다. fp32 가 아니면 백엔드 이름을 붙입니다."""
+    name = getattr(model, "model_name", None) or getattr(model.model, "name_or_path", type(model.model).__name__)
+    backend = getattr(model, "backend", "torch-fp32")
+    return name if backend == "torch-fp32" else f"{name}@{backend}"
+
+@st.cache_resource
+def get_emoji_worker():
+    """라벨 → 카테고리(flan-t5) 분류 백그라운드 워커를 생성하고 캐싱합니다."""
+    return EmojiCategoryWorker(EMOJI_CATEGORY_DB)
+
+# 키워드 → (우선순위, 이모지) 색인 (import 시 1회 생성, 딕셔너리 순서가 우선순위)
+EMOJI_KEYWORD_INDEX = {
+    keyword: (priority, emoji)
+    for priority, (keyword, emoji) in enumerate(EMOJI_KEYWORD_MAP.items())
+}
+_WORD_RE = re.compile(r"[a-z]+")
+
+def match_emoji_keyword(label_text):
+    """라벨 문자열을 단어 단위로 나눠 색인에서 찾고, 우선순위가 가장 높은 이모지를 반환합니다.
+
+    부분 문자열이 아닌 단어 단위로 비교하므로 "catamaran" 은 "cat" 에, "grape" 는 "ape" 에 걸리지 않습니다.
+    (복수형 "dogs" 처럼 끝의 s 만 다른 경우는 같은 단어로 봅니다)
+    """
+    best = None
+    for word in _WORD_RE.findall(label_text.lower()):
+        hit = EMOJI_KEYWORD_INDEX.get(word)
+        if hit is None and word.endswith("s"):
+            hit = EMOJI_KEYWORD_INDEX.get(word[:-1])
+        if hit is not None and (best is None or hit[0] < best[0]):
+            best = hit
+    return best[1] if best else None
+
+def category_to_emoji(category):
+    """LLM이 뱉은 카테고리 단어를 이모지로 변환합니다."""
+    return match_emoji_keyword(category) or "🖼️"
+
+@lru_cache(maxsize=4096)
+def _keyword_emoji(labels):
+    # 같은 라벨 조합은 메모된 결과를 그대로 사용
+    return match_emoji_keyword(", ".join(labels))
+
+def request_emoji(labels):
+    """바로 보여줄 이모지와, LLM 분류가 진행 중이면 그 Future 를 반환합니다.
+
+    1. 키워드 기반 즉시 매핑 (가장 정확하고 빠름)
+    2. 키워드가 없을 때만 백그라운드 워커에 카테고리 분류를 맡기고 임시 이모지 반환
+    """
+    labels = tuple(labels)
+    emoji = _keyword_emoji(labels)
+    if emoji:
+        return emoji, None
+
+    future = get_emoji_worker().submit(labels)
+    if future.done() and future.exception() is None:
+        return category_to_emoji(future.result()), None
+    return PLACEHOLDER_EMOJI, future
+
+def get_emoji_from_labels(labels, timeout=EMOJI_WAIT_TIMEOUT):
+    emoji, future = request_emoji(labels)
+    if future is None:
+        return emoji
+    try:
+        return category_to_emoji(future.result(timeout=timeout))
+    except Exception:
+        return "🖼️"
+
+def render_profiling_toggle():
+    """사이드바에 프로파일링 모드 토글을 그립니다. (페이지를 옮겨도 설정 유지)"""
+    st.session_state.profiling = st.sidebar.toggle(
+        "🔬 프로파일링 모드", value=st.session_state.get("profiling", False),
+        help="추론을 decode/preprocess/forward/postprocess 단계로 나눠 기록합니다."
     )
-    
-    out = pipe(prompt, max_new_tokens=5)[0]["generated_text"].lower().strip()
-    
-    # 모델이 뱉은 카테고리 단어를 다시 이모지로 변환
-    return EMOJI_KEYWORD_MAP.get(out, "🖼️") 
 
-def run_inference(image, model):
-    """이미지 분류를 수행하고 결과와 소요 시간을 반환합니다."""
+def is_profiling_enabled():
+    return st.session_state.get("profiling", False)
+
+def run_inference(image, model, top_k=5, profile=False):
+    """이미지 분류를 수행하고 결과와 소요 시간을 반환합니다.
+
+    profile=True 이면 단계별 시간을 프로파일러에 기록합니다. (프로파일링 대시보드에서 확인)
+    """
     start = time.time()
-    results = model(image)
+    if profile:
+        results = profile_inference(image, model, get_model_name(model), top_k=top_k)
+    else:
+        results = model(image, top_k=top_k)
     elapsed = time.time() - start
 
-    df = pd.DataFrame(results[:5])
+    df = pd.DataFrame(results[:top_k])
     return df, elapsed, results
 
+def run_inference_cached(image, model, top_k=5):
+    """결과 캐시를 먼저 확인하고, 없을 때만 run_inference를 수행합니다.
+
+    반환값: (df, 소요 시간, results, 캐시 적중 여부)
+    """
+    cache = get_result_cache()
+    start = time.time()
+    key = make_key(image_hash(image), get_model_name(model), top_k)
+    results = cache.get(key)
+    if results is not None:
+        # 캐시 적중: 전처리/모델 실행 없이 바로 반환
+        return pd.DataFrame(results[:top_k]), time.time() - start, results, True
+
+    df, elapsed, results = run_inference(image, model, top_k=top_k, profile=is_profiling_enabled())
+    cache.put(key, results)
+    return df, elapsed, results, False
+
 def classify_and_show(image, model, title="결과"):
     """상세한 분류 결과와 시각화 차트를 출력합니다."""
-    df, elapsed, results = run_inference(image, model)
+    df, elapsed, results, cache_hit = run_inference_cached(image, model)
     
     st.subheader("🔎 분류 결과")
     
@@ -87,10 +223,14 @@ def classify_and_show(image, model, title="결과"):
     
     # 이모지 변환 
     labels = [r["label"] for r in results[:5]]
-    emoji = get_emoji_from_labels(labels)
+    emoji, emoji_future = request_emoji(labels)
 
-    st.metric(label="가장 유력한 결과", value=f"{emoji} {prediction}")
-    st.write(f"⏱ 추론 시간: {elapsed:.3f}초")
+    top_metric = st.empty()
+    top_metric.metric(label="가장 유력한 결과", value=f"{emoji} {prediction}")
+    if cache_hit:
+        st.write(f"⏱ 추론 시간: {elapsed:.3f}초 (캐시 적중 ⚡)")
+    else:
+        st.write(f"⏱ 추론 시간: {elapsed:.3f}초")
     
     st.write("---")
     
@@ -103,12 +243,169 @@ def classify_and_show(image, model, title="결과"):
 
     fig = px.bar(df, x="label", y="score", title=f"{title} Top-5 결과")
     st.plotly_chart(fig, key=title)
+
+    # 나머지 화면을 먼저 그린 뒤, LLM 카테고리 결과가 오면 이모지 채우기
+    if emoji_future is not None:
+        try:
+            emoji = category_to_emoji(emoji_future.result(timeout=EMOJI_WAIT_TIMEOUT))
+        except Exception:
+            emoji = "🖼️"
+        top_metric.metric(label="가장 유력한 결과", value=f"{emoji} {prediction}")
     return results
 
 def classify_image(image, model, top_k=5):
     """이미지 분류 후 결과 DataFrame만 반환합니다."""
-    df, _, _ = run_inference(image, model)
-    return df.head(top_k)
+    df, _, _, _ = run_inference_cached(image, model, top_k=top_k)
+    return df
+
+def compare_models(image, model_keys, backend=DEFAULT_BACKEND, max_workers=None, thread_budget=None,
+                   top_k=5, profile=False):
+    """여러 모델을 워커 풀에서 동시에 실행하고, 끝나는 순서대로 결과를 yield 합니다.
+
+    model_keys: MODEL_CANDIDATES 의 키 목록 (모델은 작업 안에서 저장소에서 빌려 씀)
+    thread_budget: 전체 torch 연산 스레드 수 (워커 수로 나눠서 배분)
+    yield: (모델 키, 결과 DataFrame, {"queue": 대기 시간, "load": 로딩 시간 (메모리 예산 대기 포함), "compute": 추론 시간})
+    """
+    if not model_keys:
+        return
+    registry = get_model_registry()
+    max_workers = min(max_workers or len(model_keys), len(model_keys))
+    thread_budget = thread_budget or torch.get_num_threads()
+
+    # torch 스레드 수는 프로세스 전역 설정이라, 워커끼리 코어를 나눠 쓰도록 미리 분배
+    prev_threads = torch.get_num_threads()
+    torch.set_num_threads(max(1, thread_budget // max_workers))
+    # 지연 로딩된 PIL 이미지를 여러 스레드가 동시에 디코딩하지 않도록 미리 로드
+    image.load()
+
+    def _task(key, submitted_at):
+        model_name = MODEL_CANDIDATES[key]
+        queue_time = time.perf_counter() - submitted_at
+        load_start = time.perf_counter()
+        # lease: 추론하는 동안만 모델을 붙잡고, 동시에 쓰는 모델 합이 메모리 예산을 넘으면 앞 작업이 끝날 때까지 대기
+        with registry.lease((model_name, backend), lambda: load_classifier(model_name, backend)) as model:
+            load_time = time.perf_counter() - load_start
+            df, elapsed, _ = run_inference(image, model, top_k=top_k, profile=profile)
+        return key, df, {"queue": queue_time, "load": load_time, "compute": elapsed}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_task, key, time.perf_counter()) for key in model_keys]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        torch.set_num_threads(prev_threads)
+
+def open_image(file, max_size=DISPLAY_MAX_SIZE):
+    """업로드 파일을 max_size 이하로 줄여서 디코딩하고, EXIF 회전을 반영한 RGB 이미지를 반환합니다.
+
+    JPEG 은 draft() 로 디코딩 단계에서 1/2~1/8 크기로 바로 읽어서 12MP 사진도 빠르고 가볍게 엽니다.
+    걸린 시간은 image.info["decode_ns"] 에 남겨서 프로파일러의 decode 단계로 기록합니다.
+    """
+    start = time.perf_counter_ns()
+    image = Image.open(file)
+    if image.format == "JPEG":
+        image.draft("RGB", (max_size, max_size))
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    # reducing_gap: reduce() 로 정수배 축소 후 리샘플링 (큰 이미지 축소가 훨씬 빠름)
+    image.thumbnail((max_size, max_size), reducing_gap=2.0)
+    image.info["decode_ns"] = time.perf_counter_ns() - start
+    return image
+
+def to_model_input(image, min_edge=MODEL_MIN_EDGE):
+    """모델에 넣을 이미지를 짧은 변 min_edge 크기로 줄입니다. (이미 작으면 그대로)"""
+    scale = min_edge / min(image.size)
+    if scale >= 1:
+        return image
+    start = time.perf_counter_ns()
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    resized = image.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+    # 모델 입력 이미지의 decode 시간 = 원본 디코딩 + 축소
+    resized.info["decode_ns"] = image.info.get("decode_ns", 0) + time.perf_counter_ns() - start
+    return resized
+
+def prepare_image(file):
+    """업로드 파일을 한 번만 디코딩해서 (화면 표시용, 모델 입력용) 이미지를 반환합니다."""
+    display_image = open_image(file)
+    return display_image, to_model_input(display_image)
+
+def _decode_image(file):
+    """업로드 파일을 모델 입력 크기로 디코딩합니다."""
+    return to_model_input(open_image(file))
+
+def make_thumbnail(image, size=THUMBNAIL_SIZE):
+    """결과 카드/세션 저장용 축소 이미지를 만듭니다."""
+    thumb = image.copy()
+    thumb.thumbnail(size)
+    return thumb
+
+def iter_classify_images(files, model, batch_size=DEFAULT_BATCH_SIZE, top_k=5, timings=None):
+    """이미지를 병렬로 디코딩하면서, 디코딩된 순서대로 batch_size 씩 분류해 결과를 하나씩 yield 합니다.
+
+    yield: (파일명, 이미지, 결과 DataFrame)
+    timings 리스트를 넘기면 배치별 소요 시간 dict 를 추가합니다.
+    """
+    cache = get_result_cache()
+    model_name = get_model_name(model)
+
+    def _run_batch(batch):
+        images = [image for _, image, _ in batch]
+        start = time.time()
+        outputs = model(images, batch_size=len(images), top_k=top_k)
+        elapsed = time.time() - start
+
+        if timings is not None:
+            timings.append({
+                "배치": len(timings) + 1,
+                "이미지 수": len(images),
+                "소요시간(s)": round(elapsed, 3),
+                "이미지당(s)": round(elapsed / len(images), 3),
+            })
+        for (name, image, key), output in zip(batch, outputs):
+            cache.put(key, output)
+            yield name, image, pd.DataFrame(output).head(top_k)
+
+    # 디코딩은 I/O + C 코드라 스레드로 병렬 처리
+    # 한 번에 batch_size 장씩만 디코딩해서, 업로드 수가 많아도 원본 이미지가 메모리에 쌓이지 않게 함
+    files = list(files)
+    executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS)
+
+    def _decoded():
+        for chunk_start in range(0, len(files), batch_size):
+            chunk = files[chunk_start:chunk_start + batch_size]
+            yield from zip(chunk, executor.map(_decode_image, chunk))
+
+    try:
+        batch = []
+        for idx, (file, image) in enumerate(_decoded()):
+            name = getattr(file, "name", f"image_{idx}")
+            key = make_key(image_hash(image), model_name, top_k)
+
+            # 캐시에 있는 이미지는 모델을 거치지 않고 바로 반환
+            output = cache.get(key)
+            if output is not None:
+                yield name, image, pd.DataFrame(output).head(top_k)
+                continue
+
+            batch.append((name, image, key))
+            if len(batch) == batch_size:
+                yield from _run_batch(batch)
+                batch = []
+
+        if batch:
+            yield from _run_batch(batch)
+    finally:
+        # 중간에 취소되면 아직 시작 안 한 디코딩은 버림
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def classify_images_batched(files, model, batch_size=DEFAULT_BATCH_SIZE, top_k=5):
+    """여러 이미지를 병렬로 디코딩한 뒤 batch_size 단위로 묶어 분류합니다.
+
+    반환값: ([(파일명, 이미지, 결과 DataFrame), ...], [배치별 소요 시간 dict, ...])
+    """
+    timings = []
+    results = list(iter_classify_images(files, model, batch_size=batch_size, top_k=top_k, timings=timings))
+    return results, timings
 
 def s_show(idx, file_name, image, df):
     st.image(image, caption=file_name, width=400)